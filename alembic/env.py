@@ -15,7 +15,8 @@ from alembic import context
 config = context.config
 
 # Set the SQLAlchemy URL dynamically from .env
-config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
+# (configparser interpolates "%", so escape URL-encoded characters)
+config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL").replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -31,6 +32,9 @@ import app.models.genre
 import app.models.movie_genre
 import app.models.movie
 import app.models.rating
+import app.models.rating_stats
+import app.models.leaderboard
+import app.models.dimension_version
 
 target_metadata = Base.metadata
 
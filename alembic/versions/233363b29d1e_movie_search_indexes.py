@@ -0,0 +1,36 @@
+"""movie search indexes
+
+Revision ID: 233363b29d1e
+Revises: 728465a911af
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '233363b29d1e'
+down_revision = '728465a911af'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(\"cast\", ''))"
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Trigram index: serves the title ILIKE '%...%' filter and word-similarity matching
+    op.create_index(
+        'ix_movies_title_trgm', 'movies', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    # Full-text search over title and cast
+    op.add_column('movies', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)))
+    op.create_index('ix_movies_search_vector', 'movies', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_movies_search_vector', table_name='movies')
+    op.drop_column('movies', 'search_vector')
+    op.drop_index('ix_movies_title_trgm', table_name='movies')
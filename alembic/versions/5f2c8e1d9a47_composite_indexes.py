@@ -0,0 +1,40 @@
+"""composite indexes
+
+Revision ID: 5f2c8e1d9a47
+Revises: 233363b29d1e
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5f2c8e1d9a47'
+down_revision = '233363b29d1e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-movie rating lookups and the ON DELETE CASCADE from movies; score makes it covering
+    # for per-movie aggregates such as the stats backfill
+    op.create_index('ix_movie_ratings_movie_id_score', 'movie_ratings', ['movie_id', 'score'])
+    # release_year filter with the default id ordering / id keyset
+    op.create_index('ix_movies_release_year_id', 'movies', ['release_year', 'id'])
+    # Director join and the ON DELETE CASCADE from directors
+    op.create_index('ix_movies_director_id', 'movies', ['director_id'])
+    # Genre filter semi-join and the ON DELETE CASCADE from genres; the primary key
+    # (movie_id, genre_id) only serves lookups by movie
+    op.create_index('ix_movie_genres_genre_id_movie_id', 'movie_genres', ['genre_id', 'movie_id'])
+    # (title, id) serves sort=title keyset pages as an index range scan and replaces the
+    # single-column title index
+    op.create_index('ix_movies_title_id', 'movies', ['title', 'id'])
+    op.drop_index('ix_movies_title', table_name='movies')
+
+
+def downgrade():
+    op.create_index('ix_movies_title', 'movies', ['title'], unique=False)
+    op.drop_index('ix_movies_title_id', table_name='movies')
+    op.drop_index('ix_movie_genres_genre_id_movie_id', table_name='movie_genres')
+    op.drop_index('ix_movies_director_id', table_name='movies')
+    op.drop_index('ix_movies_release_year_id', table_name='movies')
+    op.drop_index('ix_movie_ratings_movie_id_score', table_name='movie_ratings')
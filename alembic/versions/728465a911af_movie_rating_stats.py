@@ -0,0 +1,41 @@
+"""movie rating stats
+
+Revision ID: 728465a911af
+Revises: 2158bad7724c
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '728465a911af'
+down_revision = '2158bad7724c'
+branch_labels = None
+depends_on = None
+
+SCORES = range(1, 11)
+
+
+def upgrade():
+    op.create_table(
+        'movie_rating_stats',
+        sa.Column('movie_id', sa.Integer(), sa.ForeignKey('movies.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('ratings_sum', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('ratings_count', sa.Integer(), server_default='0', nullable=False),
+        *[sa.Column(f'score_{score}_count', sa.Integer(), server_default='0', nullable=False) for score in SCORES],
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+
+    # Backfill from the existing ratings in one pass
+    histogram_columns = ", ".join(f"score_{score}_count" for score in SCORES)
+    histogram_values = ", ".join(f"COUNT(*) FILTER (WHERE score = {score})" for score in SCORES)
+    op.execute(
+        f"INSERT INTO movie_rating_stats (movie_id, ratings_sum, ratings_count, {histogram_columns}, updated_at) "
+        f"SELECT movie_id, SUM(score), COUNT(*), {histogram_values}, NOW() AT TIME ZONE 'utc' "
+        "FROM movie_ratings WHERE movie_id IS NOT NULL AND score IS NOT NULL GROUP BY movie_id"
+    )
+
+
+def downgrade():
+    op.drop_table('movie_rating_stats')
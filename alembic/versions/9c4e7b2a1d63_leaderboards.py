@@ -0,0 +1,69 @@
+"""leaderboards
+
+Revision ID: 9c4e7b2a1d63
+Revises: 5f2c8e1d9a47
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9c4e7b2a1d63'
+down_revision = '5f2c8e1d9a47'
+branch_labels = None
+depends_on = None
+
+# Defaults of LEADERBOARD_PRIOR_VOTES / LEADERBOARD_PRIOR_MEAN; with other settings, run
+# scripts/rebuild_leaderboards.py after upgrading
+PRIOR_VOTES = 10
+PRIOR_MEAN = 5.5
+
+
+def upgrade():
+    # Existing ratings have no timestamps, so trending starts empty and fills as ratings arrive
+    op.add_column('movie_rating_stats', sa.Column('trend', postgresql.DOUBLE_PRECISION(), nullable=True))
+
+    op.create_table(
+        'leaderboard_entries',
+        sa.Column('board', sa.String(length=8), primary_key=True),
+        sa.Column('board_key', sa.Integer(), primary_key=True),
+        sa.Column('movie_id', sa.Integer(), sa.ForeignKey('movies.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('weighted_score', postgresql.DOUBLE_PRECISION(), nullable=False),
+        sa.Column('ratings_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('trend', postgresql.DOUBLE_PRECISION(), nullable=True),
+    )
+    # Entry refreshes by movie and the ON DELETE CASCADE from movies
+    op.create_index('ix_leaderboard_entries_movie_id', 'leaderboard_entries', ['movie_id'])
+    # One range scan per board, already in rank order
+    op.create_index(
+        'ix_leaderboard_entries_top', 'leaderboard_entries',
+        ['board', 'board_key', sa.text('weighted_score DESC'), 'movie_id'],
+    )
+    op.create_index(
+        'ix_leaderboard_entries_trending', 'leaderboard_entries',
+        ['board', 'board_key', sa.text('trend DESC NULLS LAST'), 'movie_id'],
+    )
+
+    score = (
+        f"(COALESCE(s.ratings_sum, 0)::double precision + {PRIOR_VOTES * PRIOR_MEAN}) "
+        f"/ (COALESCE(s.ratings_count, 0) + {PRIOR_VOTES})"
+    )
+    boards = [
+        ("'all'", "0", ""),
+        ("'genre'", "mg.genre_id", "JOIN movie_genres mg ON mg.movie_id = m.id"),
+        ("'year'", "m.release_year", ""),
+    ]
+    for board, key, join in boards:
+        where = "WHERE m.release_year IS NOT NULL" if key == "m.release_year" else ""
+        op.execute(
+            "INSERT INTO leaderboard_entries (board, board_key, movie_id, weighted_score, ratings_count, trend) "
+            f"SELECT {board}, {key}, m.id, {score}, COALESCE(s.ratings_count, 0), s.trend "
+            f"FROM movies m {join} LEFT JOIN movie_rating_stats s ON s.movie_id = m.id {where}"
+        )
+
+
+def downgrade():
+    op.drop_table('leaderboard_entries')
+    op.drop_column('movie_rating_stats', 'trend')
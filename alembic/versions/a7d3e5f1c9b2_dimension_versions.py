@@ -0,0 +1,51 @@
+"""dimension versions
+
+Revision ID: a7d3e5f1c9b2
+Revises: 9c4e7b2a1d63
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5f1c9b2'
+down_revision = '9c4e7b2a1d63'
+branch_labels = None
+depends_on = None
+
+TABLES = ('directors', 'genres')
+
+
+def upgrade():
+    # One counter per dimension table, bumped by any statement that changes it, so app processes
+    # can tell whether their in-memory copy is current with a single-row read
+    op.create_table(
+        'dimension_versions',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), server_default='1', nullable=False),
+    )
+    op.execute("INSERT INTO dimension_versions (name) VALUES " + ", ".join(f"('{table}')" for table in TABLES))
+    op.execute(
+        """
+        CREATE FUNCTION bump_dimension_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE dimension_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_bump_dimension_version "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_dimension_version()"
+        )
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_bump_dimension_version ON {table}")
+    op.execute("DROP FUNCTION bump_dimension_version()")
+    op.drop_table('dimension_versions')
@@ -0,0 +1,31 @@
+"""rating dedup
+
+Revision ID: b3f8d2c6e4a1
+Revises: a7d3e5f1c9b2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8d2c6e4a1'
+down_revision = 'a7d3e5f1c9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Both columns stay NULL on existing ratings, which the unique constraints do not compare
+    op.add_column('movie_ratings', sa.Column('user_id', sa.String(length=64), nullable=True))
+    op.add_column('movie_ratings', sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+    # (movie_id, user_id) is the upsert target for per-user votes
+    op.create_unique_constraint('uq_movie_ratings_movie_id_user_id', 'movie_ratings', ['movie_id', 'user_id'])
+    op.create_unique_constraint('uq_movie_ratings_idempotency_key', 'movie_ratings', ['idempotency_key'])
+
+
+def downgrade():
+    op.drop_constraint('uq_movie_ratings_idempotency_key', 'movie_ratings', type_='unique')
+    op.drop_constraint('uq_movie_ratings_movie_id_user_id', 'movie_ratings', type_='unique')
+    op.drop_column('movie_ratings', 'idempotency_key')
+    op.drop_column('movie_ratings', 'user_id')
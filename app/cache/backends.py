@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class CacheBackend:
+    """Key/value interface the response cache is written against.
+
+    Backends with `serializes = True` stand for stores outside the process (e.g. Redis) and only
+    hold bytes; the in-process LRU keeps the Python objects themselves.
+    """
+
+    serializes = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class _Counters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.deletes = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class NullCache(CacheBackend):
+    """Caching disabled: every lookup is a miss."""
+
+    def __init__(self):
+        self._counters = _Counters()
+        self._generations: Dict[str, int] = {}
+
+    def get(self, key):
+        self._counters.misses += 1
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def get_counter(self, key):
+        return self._generations.get(key, 0)
+
+    def incr(self, key):
+        self._generations[key] = self._generations.get(key, 0) + 1
+        return self._generations[key]
+
+    def stats(self):
+        return {"backend": "none", "entries": 0, **self._counters.as_dict()}
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Counters live outside the LRU so evicting entries never resets a generation
+        self._generations: Dict[str, int] = {}
+        self._counters = _Counters()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._counters.expirations += 1
+                self._counters.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._counters.deletes += 1
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            return self._generations[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "lru",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                **self._counters.as_dict(),
+            }
+
+
+class InMemorySharedCache(LRUCache):
+    """Local stand-in for a shared cache server.
+
+    It only accepts bytes, like a network store would, so code exercised against it behaves the
+    same once a real shared backend implementing CacheBackend is plugged in.
+    """
+
+    serializes = True
+
+    def set(self, key, value, ttl):
+        if not isinstance(value, bytes):
+            raise TypeError("shared cache values must be bytes")
+        super().set(key, value, ttl)
+
+    def stats(self):
+        stats = super().stats()
+        stats["backend"] = "shared"
+        return stats
+
+
+def create_backend(name: str, max_entries: int) -> CacheBackend:
+    if name == "none":
+        return NullCache()
+    if name == "lru":
+        return LRUCache(max_entries)
+    if name == "shared":
+        return InMemorySharedCache(max_entries)
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
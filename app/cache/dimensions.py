@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import DIMENSION_REFRESH_SECONDS
+from app.repositories import dimension_repository
+from app.schemas.director import DirectorDetailOut, DirectorOut
+from app.schemas.genre import GenreDetailOut
+
+
+class DimensionSnapshot:
+    """Immutable in-memory copy of the directors and genres tables at one version.
+
+    Movie responses are assembled from this instead of joining the tables on every read.
+    """
+
+    __slots__ = ("version", "directors", "genres", "director_refs", "genre_names_by_id", "genre_ids_by_name")
+
+    def __init__(self, version: Tuple[int, int], directors: List[DirectorDetailOut], genres: List[GenreDetailOut]):
+        self.version = version
+        self.directors: Dict[int, DirectorDetailOut] = {director.id: director for director in directors}
+        self.genres: Dict[int, GenreDetailOut] = {genre.id: genre for genre in genres}
+        self.director_refs: Dict[int, DirectorOut] = {
+            director.id: DirectorOut(id=director.id, name=director.name) for director in directors
+        }
+        self.genre_names_by_id: Dict[int, str] = {genre.id: genre.name for genre in genres}
+        self.genre_ids_by_name: Dict[str, int] = {genre.name: genre.id for genre in genres}
+
+    def covers(self, director_ids: Iterable[int], genre_ids: Iterable[int]) -> bool:
+        return all(director_id in self.directors for director_id in director_ids) and all(
+            genre_id in self.genres for genre_id in genre_ids
+        )
+
+    def genre_names(self, genre_ids: Iterable[int]) -> List[str]:
+        """Names of `genre_ids` in name order, as movie responses list them."""
+        return sorted(self.genre_names_by_id[genre_id] for genre_id in genre_ids)
+
+
+class DimensionStore:
+    """Holds the current DimensionSnapshot and reloads it when the tables change.
+
+    The dimension_versions counters are read at most every `refresh_seconds`, or right away when
+    a caller needs ids the snapshot does not have yet (e.g. a director created by another
+    process); the tables are only reloaded when a counter moved. The lock is never waited on:
+    in DB_ASYNC mode requests run as greenlets on the event loop thread, where blocking on a
+    lock held by another request would stall the loop, so callers that find a refresh in
+    progress keep using the current snapshot.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DimensionSnapshot] = None
+        self._checked_at = 0.0
+        self.checks = 0
+        self.loads = 0
+
+    def get(self, db: Session, director_ids: Iterable[int] = (), genre_ids: Iterable[int] = ()) -> DimensionSnapshot:
+        """The current snapshot, refreshed first when it is due or lacks any of the given ids."""
+        snapshot = self._snapshot
+        director_ids, genre_ids = set(director_ids), set(genre_ids)
+        complete = snapshot is not None and snapshot.covers(director_ids, genre_ids)
+        if complete and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return snapshot
+        if not self._lock.acquire(blocking=False):
+            if complete:
+                return snapshot
+            # Without the ids the response cannot be built; a duplicate refresh is harmless
+            return self.refresh(db)
+        try:
+            return self.refresh(db)
+        finally:
+            self._lock.release()
+
+    def refresh(self, db: Session) -> DimensionSnapshot:
+        """Check the version counters and reload both tables if either moved."""
+        version = dimension_repository.get_dimension_versions(db)
+        self.checks += 1
+        self._checked_at = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        directors = [DirectorDetailOut(**row._mapping) for row in dimension_repository.load_directors(db)]
+        genres = [GenreDetailOut(**row._mapping) for row in dimension_repository.load_genres(db)]
+        snapshot = self._snapshot = DimensionSnapshot(version, directors, genres)
+        self.loads += 1
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "directors_version": snapshot.version[0] if snapshot else None,
+            "genres_version": snapshot.version[1] if snapshot else None,
+            "directors": len(snapshot.directors) if snapshot else 0,
+            "genres": len(snapshot.genres) if snapshot else 0,
+            "checks": self.checks,
+            "loads": self.loads,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+store = DimensionStore(DIMENSION_REFRESH_SECONDS)
@@ -0,0 +1,158 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.cache.backends import create_backend
+from app.conditional import Validators
+from app.config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, REPLICA_MAX_LAG_SECONDS
+from app.schemas.leaderboard import LeaderboardOut
+from app.schemas.movie import MovieDetailOut, PaginatedResponse
+from app.schemas.rating import RatingSummaryOut
+
+backend = create_backend(CACHE_BACKEND, CACHE_MAX_ENTRIES)
+
+# Creating, deleting or editing a movie can move rows in or out of any filtered page, so list
+# entries are keyed by a generation number and such writes invalidate them all by bumping it.
+LIST_GENERATION_KEY = "movies:list:generation"
+# Ratings reorder the pages sorted by average rating and the leaderboards, which are also keyed by
+# this second generation; other pages only show a slightly old average until their TTL expires.
+RATINGS_GENERATION_KEY = "movies:ratings:generation"
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def _detail_key(movie_id: int) -> str:
+    return f"movies:detail:{movie_id}"
+
+
+def _validators_key(movie_id: int) -> str:
+    return f"movies:validators:{movie_id}"
+
+
+def _rating_summary_key(movie_id: int) -> str:
+    return f"movies:rating-summary:{movie_id}"
+
+
+def _written_key(scope: Any) -> str:
+    return f"movies:written:{scope}"
+
+
+def _mark_written(scope: Any) -> None:
+    backend.set(_written_key(scope), b"1", REPLICA_MAX_LAG_SECONDS)
+
+
+def _may_store(scope: Any, from_replica: bool) -> bool:
+    """False for a replica read of entries invalidated within the replication lag: it may predate the write."""
+    return not from_replica or backend.get(_written_key(scope)) is None
+
+
+def _may_store_list(by_rating: bool, from_replica: bool) -> bool:
+    return _may_store("lists", from_replica) and (not by_rating or _may_store("ratings", from_replica))
+
+
+def _sorted_by_rating(params: Dict[str, Any]) -> bool:
+    return params.get("sort") == "average_rating"
+
+
+def _list_key(params: Dict[str, Any], by_rating: bool = False) -> str:
+    if params.get("title"):
+        # The title filter is an ILIKE, so case does not change the result
+        params = {**params, "title": params["title"].strip().lower()}
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    generation = backend.get_counter(LIST_GENERATION_KEY)
+    if by_rating:
+        return f"movies:list:{generation}:{backend.get_counter(RATINGS_GENERATION_KEY)}:{digest}"
+    return f"movies:list:{generation}:{digest}"
+
+
+def _load(key: str, model: Type[Model]) -> Optional[Model]:
+    value = backend.get(key)
+    if value is not None and backend.serializes:
+        return model.model_validate_json(value)
+    return value
+
+
+def _store(key: str, value: BaseModel) -> None:
+    backend.set(key, value.model_dump_json().encode() if backend.serializes else value, CACHE_TTL_SECONDS)
+
+
+def get_detail(movie_id: int) -> Optional[MovieDetailOut]:
+    return _load(_detail_key(movie_id), MovieDetailOut)
+
+
+def set_detail(movie_id: int, detail: MovieDetailOut, from_replica: bool = False) -> None:
+    if _may_store(movie_id, from_replica):
+        _store(_detail_key(movie_id), detail)
+
+
+def get_detail_validators(movie_id: int) -> Optional[Validators]:
+    value = backend.get(_validators_key(movie_id))
+    if value is not None and backend.serializes:
+        etag, last_modified = json.loads(value)
+        return Validators(etag, datetime.fromisoformat(last_modified) if last_modified else None)
+    return value
+
+
+def set_detail_validators(movie_id: int, validators: Validators, from_replica: bool = False) -> None:
+    if not _may_store(movie_id, from_replica):
+        return
+    if backend.serializes:
+        last_modified = validators.last_modified.isoformat() if validators.last_modified else None
+        value = json.dumps([validators.etag, last_modified]).encode()
+    else:
+        value = validators
+    backend.set(_validators_key(movie_id), value, CACHE_TTL_SECONDS)
+
+
+def get_rating_summary(movie_id: int) -> Optional[RatingSummaryOut]:
+    return _load(_rating_summary_key(movie_id), RatingSummaryOut)
+
+
+def set_rating_summary(movie_id: int, summary: RatingSummaryOut, from_replica: bool = False) -> None:
+    if _may_store(movie_id, from_replica):
+        _store(_rating_summary_key(movie_id), summary)
+
+
+def get_list(params: Dict[str, Any]) -> Optional[PaginatedResponse]:
+    return _load(_list_key(params, _sorted_by_rating(params)), PaginatedResponse)
+
+
+def set_list(params: Dict[str, Any], page: PaginatedResponse, from_replica: bool = False) -> None:
+    by_rating = _sorted_by_rating(params)
+    if _may_store_list(by_rating, from_replica):
+        _store(_list_key(params, by_rating), page)
+
+
+def get_leaderboard(params: Dict[str, Any]) -> Optional[LeaderboardOut]:
+    return _load(_list_key({"leaderboard": True, **params}, by_rating=True), LeaderboardOut)
+
+
+def set_leaderboard(params: Dict[str, Any], board: LeaderboardOut, from_replica: bool = False) -> None:
+    if _may_store_list(True, from_replica):
+        _store(_list_key({"leaderboard": True, **params}, by_rating=True), board)
+
+
+def invalidate_lists() -> None:
+    backend.incr(LIST_GENERATION_KEY)
+    _mark_written("lists")
+
+
+def invalidate_ratings() -> None:
+    """Drop the list pages sorted by average rating and every leaderboard."""
+    backend.incr(RATINGS_GENERATION_KEY)
+    _mark_written("ratings")
+
+
+def invalidate_movie(movie_id: int) -> None:
+    """Drop the movie's detail entry, validators and rating summary; list pages are left alone."""
+    backend.delete(_detail_key(movie_id))
+    backend.delete(_validators_key(movie_id))
+    backend.delete(_rating_summary_key(movie_id))
+    _mark_written(movie_id)
+
+
+def stats() -> Dict[str, Any]:
+    return {**backend.stats(), "ttl_seconds": CACHE_TTL_SECONDS}
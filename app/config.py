@@ -0,0 +1,55 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Ids, years and counts are int4 columns. Values outside this range are rejected with a 422
+# before they reach the driver: asyncpg cannot encode them, where psycopg2 let Postgres find no match
+INT4_MIN, INT4_MAX = -2 ** 31, 2 ** 31 - 1
+
+# Upper bound on page_size for list endpoints
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+# Response cache for movie list/detail: "lru" (in-process), "shared" or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "lru")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+# Longest replication delay expected of the read replicas (DATABASE_REPLICA_URLS): a cache entry
+# invalidated within it is not refilled from a replica, which may still return the old rows
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+
+# Directors and genres are served from an in-process snapshot; its version counters are
+# re-checked at most this often (a reference to an unknown id re-checks at once)
+DIMENSION_REFRESH_SECONDS = float(os.getenv("DIMENSION_REFRESH_SECONDS", "5"))
+
+# Most ids accepted by one GET /movies/batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+
+# Leaderboards rank by a Bayesian average: each movie's mean pulled toward PRIOR_MEAN as if it had
+# PRIOR_VOTES extra votes. Run scripts/rebuild_leaderboards.py after changing either.
+LEADERBOARD_PRIOR_VOTES = float(os.getenv("LEADERBOARD_PRIOR_VOTES", "10"))
+LEADERBOARD_PRIOR_MEAN = float(os.getenv("LEADERBOARD_PRIOR_MEAN", "5.5"))
+# Trending ranks by rating activity that halves in weight every TRENDING_HALF_LIFE_HOURS
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+MAX_LEADERBOARD_SIZE = int(os.getenv("MAX_LEADERBOARD_SIZE", "100"))
+
+# "sync" writes each rating before responding; "buffered" queues it for batched writes
+RATING_INGEST_MODE = os.getenv("RATING_INGEST_MODE", "sync")
+RATING_BATCH_SIZE = int(os.getenv("RATING_BATCH_SIZE", "500"))
+RATING_FLUSH_INTERVAL = float(os.getenv("RATING_FLUSH_INTERVAL", "0.5"))
+RATING_BUFFER_MAX = int(os.getenv("RATING_BUFFER_MAX", "10000"))
+RATING_ENQUEUE_TIMEOUT = float(os.getenv("RATING_ENQUEUE_TIMEOUT", "0.1"))
+# A batch that fails to write is retried this many times, backing off from RATING_RETRY_BACKOFF
+# seconds and doubling each time, before its ratings are counted as failed
+RATING_FLUSH_RETRIES = int(os.getenv("RATING_FLUSH_RETRIES", "3"))
+RATING_RETRY_BACKOFF = float(os.getenv("RATING_RETRY_BACKOFF", "0.5"))
+
+# Add a Server-Timing header with per-request DB time and query count
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+# Rows per transaction for bulk movie imports
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+# Rows fetched per server-side cursor batch and per streamed chunk in exports
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
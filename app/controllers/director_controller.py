@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Literal, Optional
+from app.config import INT4_MAX, MAX_PAGE_SIZE
+from app.controllers.params import PathId
+from app.db.session import DbSession, get_read_db, run_db
+from app.responses import envelope_with_content_etag
+from app.schemas.director import DirectorDetailOut, DirectorPage
+from app.schemas.envelope import Envelope
+from app.schemas.movie import PaginatedResponse
+from app.services.dimension_service import get_director, get_director_movies, list_directors
+
+router = APIRouter(prefix="/api/v1/directors", tags=["directors"])
+
+@router.get("/", response_model=Envelope[DirectorPage], responses={304: {"description": "Not Modified"}})
+async def list_all_directors(
+    request: Request,
+    page: int = Query(1, ge=1, le=INT4_MAX),
+    page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: DbSession = Depends(get_read_db)
+):
+    data = await run_db(db, list_directors, page, page_size)
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/{director_id}", response_model=Envelope[DirectorDetailOut], responses={304: {"description": "Not Modified"}})
+async def get_one_director(director_id: PathId, request: Request, db: DbSession = Depends(get_read_db)):
+    data = await run_db(db, get_director, director_id)
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/{director_id}/movies", response_model=Envelope[PaginatedResponse], responses={304: {"description": "Not Modified"}})
+async def list_director_movies(
+    director_id: PathId,
+    request: Request,
+    page: int = Query(1, ge=1, le=INT4_MAX),
+    page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    sort: Literal["id", "title", "average_rating"] = Query("id"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(True),
+    db: DbSession = Depends(get_read_db)
+):
+    data = await run_db(db, get_director_movies, director_id, page, page_size, sort, cursor, include_total)
+    return envelope_with_content_etag(request.headers, data)
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Literal, Optional
+from app.config import INT4_MAX, MAX_PAGE_SIZE
+from app.controllers.params import PathId
+from app.db.session import DbSession, get_read_db, run_db
+from app.responses import envelope_with_content_etag
+from app.schemas.envelope import Envelope
+from app.schemas.genre import GenreDetailOut, GenreList
+from app.schemas.movie import PaginatedResponse
+from app.services.dimension_service import get_genre, get_genre_movies, list_genres
+
+router = APIRouter(prefix="/api/v1/genres", tags=["genres"])
+
+@router.get("/", response_model=Envelope[GenreList], responses={304: {"description": "Not Modified"}})
+async def list_all_genres(request: Request, db: DbSession = Depends(get_read_db)):
+    data = await run_db(db, list_genres)
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/{genre_id}", response_model=Envelope[GenreDetailOut], responses={304: {"description": "Not Modified"}})
+async def get_one_genre(genre_id: PathId, request: Request, db: DbSession = Depends(get_read_db)):
+    data = await run_db(db, get_genre, genre_id)
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/{genre_id}/movies", response_model=Envelope[PaginatedResponse], responses={304: {"description": "Not Modified"}})
+async def list_genre_movies(
+    genre_id: PathId,
+    request: Request,
+    page: int = Query(1, ge=1, le=INT4_MAX),
+    page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    sort: Literal["id", "title", "average_rating"] = Query("id"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(True),
+    db: DbSession = Depends(get_read_db)
+):
+    data = await run_db(db, get_genre_movies, genre_id, page, page_size, sort, cursor, include_total)
+    return envelope_with_content_etag(request.headers, data)
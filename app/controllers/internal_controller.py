@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from app.cache import movie_cache
+from app.cache.dimensions import store as dimension_store
+from app.db.instrumentation import route_stats
+from app.db.pool import pool_status
+from app.db.session import engine, async_engine, replica_router
+from app.services import rating_ingest
+
+router = APIRouter(prefix="/internal", tags=["internal"], include_in_schema=False)
+
+@router.get("/pool", response_model=dict)
+def get_pool_status():
+    data = {"sync": pool_status(engine.pool)}
+    if async_engine is not None:
+        data["async"] = pool_status(async_engine.pool)
+    if replica_router.replicas:
+        data["read_replicas"] = replica_router.status()
+    return {"status": "success", "data": data}
+
+@router.get("/cache", response_model=dict)
+def get_cache_stats():
+    return {"status": "success", "data": movie_cache.stats()}
+
+@router.get("/dimensions", response_model=dict)
+def get_dimension_stats():
+    return {"status": "success", "data": dimension_store.stats()}
+
+@router.get("/queries", response_model=dict)
+def get_query_stats():
+    return {"status": "success", "data": route_stats.snapshot()}
+
+@router.get("/rating-ingest", response_model=dict)
+def get_rating_ingest_stats():
+    return {"status": "success", "data": rating_ingest.buffer.stats()}
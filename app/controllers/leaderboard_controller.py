@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Optional
+from app.config import INT4_MAX, INT4_MIN, MAX_LEADERBOARD_SIZE
+from app.db.session import DbSession, get_read_db, run_db
+from app.responses import envelope_with_content_etag
+from app.schemas.envelope import Envelope
+from app.schemas.leaderboard import LeaderboardOut
+from app.services.leaderboard_service import get_leaderboard
+
+router = APIRouter(prefix="/api/v1/leaderboards", tags=["leaderboards"])
+
+@router.get("/top-rated", response_model=Envelope[LeaderboardOut], responses={304: {"description": "Not Modified"}})
+async def top_rated(
+    request: Request,
+    genre: Optional[str] = Query(None),
+    release_year: Optional[int] = Query(None, ge=INT4_MIN, le=INT4_MAX),
+    limit: int = Query(20, ge=1, le=MAX_LEADERBOARD_SIZE),
+    min_votes: int = Query(0, ge=0, le=INT4_MAX, description="Leave out movies with fewer ratings"),
+    db: DbSession = Depends(get_read_db)
+):
+    """Movies ranked by Bayesian-weighted average rating."""
+    data = await run_db(db, get_leaderboard, "top-rated", genre, release_year, limit, min_votes)
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/trending", response_model=Envelope[LeaderboardOut], responses={304: {"description": "Not Modified"}})
+async def trending(
+    request: Request,
+    genre: Optional[str] = Query(None),
+    release_year: Optional[int] = Query(None, ge=INT4_MIN, le=INT4_MAX),
+    limit: int = Query(20, ge=1, le=MAX_LEADERBOARD_SIZE),
+    min_votes: int = Query(0, ge=0, le=INT4_MAX, description="Leave out movies with fewer ratings"),
+    db: DbSession = Depends(get_read_db)
+):
+    """Movies ranked by recent rating activity, decaying with TRENDING_HALF_LIFE_HOURS."""
+    data = await run_db(db, get_leaderboard, "trending", genre, release_year, limit, min_votes)
+    return envelope_with_content_etag(request.headers, data)
@@ -1,48 +1,159 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import Optional
-from app.db.session import get_db
-from app.services.movie_service import get_all_movies, get_movie_detail, create_new_movie, update_existing_movie, delete_existing_movie
-from app.services.rating_service import add_rating
-from app.schemas.movie import MovieCreate, MovieUpdate, PaginatedResponse, MovieDetailOut
-from app.schemas.rating import RatingCreate, RatingOut
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional, Union
+from app.config import INT4_MAX, INT4_MIN, MAX_BATCH_SIZE, MAX_PAGE_SIZE, RATING_INGEST_MODE
+from app.controllers.params import PathId
+from app.db.session import DbSession, get_db, get_read_db, run_db
+from app.services.movie_service import get_all_movies, get_movies_batch, get_movie_detail_if_modified, create_new_movie, update_existing_movie, delete_existing_movie
+from app.services.rating_service import add_rating, enqueue_rating, get_rating_summary, get_rating_summaries, validate_rating
+from app.services.import_service import decode_ndjson, import_movies
+from app.services.export_service import stream_movie_export
+from app.conditional import not_modified
+from app.responses import EnvelopeResponse, envelope_with_content_etag
+from app.schemas.envelope import Envelope
+from app.schemas.movie import MovieCreate, MovieUpdate, PaginatedResponse, MovieDetailOut, MovieBatchOut
+from app.schemas.movie_import import MovieImportResult
+from app.schemas.rating import RatingCreate, RatingOut, RatingQueuedOut, RatingSummaryOut, RatingSummaryBatchOut
+from app.exceptions.custom_exceptions import ValidationException
 
 router = APIRouter(prefix="/api/v1/movies", tags=["movies"])
 
-@router.get("/", response_model=dict)
-def list_movies(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
+IDS_DESCRIPTION = f"Comma-separated movie ids, at most {MAX_BATCH_SIZE}; results keep this order"
+
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        movie_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise ValidationException("ids must be a comma-separated list of integers")
+    if not movie_ids:
+        raise ValidationException("ids must contain at least one movie id")
+    if not all(1 <= movie_id <= INT4_MAX for movie_id in movie_ids):
+        raise ValidationException(f"ids must be between 1 and {INT4_MAX}")
+    if len(movie_ids) > MAX_BATCH_SIZE:
+        raise ValidationException(f"At most {MAX_BATCH_SIZE} ids can be requested at once")
+    return movie_ids
+
+@router.get("/", response_model=Envelope[PaginatedResponse], responses={304: {"description": "Not Modified"}})
+async def list_movies(
+    request: Request,
+    page: int = Query(1, ge=1, le=INT4_MAX),
+    page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
     title: Optional[str] = Query(None),
-    release_year: Optional[int] = Query(None),
-    genre: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    release_year: Optional[int] = Query(None, ge=INT4_MIN, le=INT4_MAX),
+    genre: Optional[List[str]] = Query(None, description="Genre name; repeat for several genres"),
+    genre_match: Literal["any", "all"] = Query("any", description="With several genres: movies in any of them, or in all"),
+    q: Optional[str] = Query(None, description="Full-text and fuzzy title search; results are ranked by relevance"),
+    sort: Optional[Literal["id", "title", "average_rating", "relevance"]] = Query(None, description="Defaults to relevance with q, id otherwise"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(True),
+    director_id: Optional[int] = Query(None, ge=1, le=INT4_MAX),
+    db: DbSession = Depends(get_read_db)
+):
+    data = await run_db(
+        db, get_all_movies, page, page_size, title, release_year, genre, sort, cursor, include_total, q, director_id,
+        genre_match
+    )
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/export")
+async def export_movies(format: Literal["ndjson", "csv"] = Query("ndjson")):
+    """Stream the full catalog with director, genres and rating stats."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_movie_export(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="movies.{format}"'},
+    )
+
+@router.get("/batch", response_model=Envelope[MovieBatchOut], responses={304: {"description": "Not Modified"}})
+async def get_movie_batch(
+    request: Request,
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    db: DbSession = Depends(get_read_db)
 ):
-    data = get_all_movies(db, page, page_size, title, release_year, genre)
-    return {"status": "success", "data": data}
+    """Fetch many movie details at once; unknown ids come back with found=false."""
+    data = await run_db(db, get_movies_batch, _parse_ids(ids))
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get(
+    "/ratings/summary", response_model=Envelope[RatingSummaryBatchOut], responses={304: {"description": "Not Modified"}}
+)
+async def get_rating_summary_batch(
+    request: Request,
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    db: DbSession = Depends(get_read_db)
+):
+    """Rating distributions of many movies at once; unknown ids come back with found=false."""
+    data = await run_db(db, get_rating_summaries, _parse_ids(ids))
+    return envelope_with_content_etag(request.headers, data)
+
+@router.get("/{movie_id}", response_model=Envelope[MovieDetailOut], responses={304: {"description": "Not Modified"}})
+async def get_movie(movie_id: PathId, request: Request, db: DbSession = Depends(get_read_db)):
+    validators, data = await run_db(db, get_movie_detail_if_modified, movie_id, request.headers)
+    if data is None:
+        return not_modified(validators)
+    return EnvelopeResponse(data, headers=validators.headers())
 
-@router.get("/{movie_id}", response_model=dict)
-def get_movie(movie_id: int, db: Session = Depends(get_db)):
-    data = get_movie_detail(db, movie_id)
-    return {"status": "success", "data": data}
 
+@router.post("/", response_model=Envelope[MovieDetailOut], status_code=201)
+async def create_movie(movie: MovieCreate, db: DbSession = Depends(get_db)):
+    data = await run_db(db, create_new_movie, movie)
+    return EnvelopeResponse(data, status_code=201)
 
-@router.post("/", response_model=dict, status_code=201)
-def create_movie(movie: MovieCreate, db: Session = Depends(get_db)):
-    data = create_new_movie(db, movie)
-    return {"status": "success", "data": data}
+@router.post(
+    "/import",
+    response_model=Envelope[MovieImportResult],
+    openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}, "required": True}},
+)
+async def import_movies_ndjson(request: Request, db: DbSession = Depends(get_db)):
+    """Bulk-create movies from an NDJSON body, one MovieCreate object per line."""
+    try:
+        body = (await request.body()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValidationException("Request body must be UTF-8 encoded NDJSON")
+    data = await run_db(db, import_movies, decode_ndjson(body.splitlines()))
+    return EnvelopeResponse(data)
 
-@router.put("/{movie_id}", response_model=dict)
-def update_movie(movie_id: int, movie: MovieUpdate, db: Session = Depends(get_db)):
-    data = update_existing_movie(db, movie_id, movie)
-    return {"status": "success", "data": data}
+@router.put("/{movie_id}", response_model=Envelope[MovieDetailOut])
+async def update_movie(movie_id: PathId, movie: MovieUpdate, db: DbSession = Depends(get_db)):
+    data = await run_db(db, update_existing_movie, movie_id, movie)
+    return EnvelopeResponse(data)
 
 @router.delete("/{movie_id}", status_code=204)
-def delete_movie(movie_id: int, db: Session = Depends(get_db)):
-    delete_existing_movie(db, movie_id)
+async def delete_movie(movie_id: PathId, db: DbSession = Depends(get_db)):
+    await run_db(db, delete_existing_movie, movie_id)
 
-@router.post("/{movie_id}/ratings", response_model=dict, status_code=201)
-def rate_movie(movie_id: int, rating: RatingCreate, db: Session = Depends(get_db)):
-    data = add_rating(db, movie_id, rating)
-    return {"status": "success", "data": data}
+@router.get(
+    "/{movie_id}/ratings/summary",
+    response_model=Envelope[RatingSummaryOut],
+    responses={304: {"description": "Not Modified"}},
+)
+async def get_movie_rating_summary(movie_id: PathId, request: Request, db: DbSession = Depends(get_read_db)):
+    """Histogram of scores 1-10 with mean, median and standard deviation."""
+    data = await run_db(db, get_rating_summary, movie_id)
+    return envelope_with_content_etag(request.headers, data)
+
+@router.post(
+    "/{movie_id}/ratings",
+    response_model=Envelope[Union[RatingOut, RatingQueuedOut]],
+    status_code=201,
+    responses={202: {"description": "Accepted for buffered ingestion (RATING_INGEST_MODE=buffered)"}},
+)
+async def rate_movie(
+    movie_id: PathId,
+    rating: RatingCreate,
+    idempotency_key: Optional[str] = Header(
+        None, min_length=1, max_length=255, description="Retries with the same key return the first rating instead of adding another"
+    ),
+    db: DbSession = Depends(get_db)
+):
+    # Deduplicated ratings (user_id or Idempotency-Key) are always written before responding
+    if RATING_INGEST_MODE == "buffered" and rating.user_id is None and idempotency_key is None:
+        await run_db(db, validate_rating, movie_id, rating)
+        # Waiting for room in a full queue must not block the event loop
+        data = await run_in_threadpool(enqueue_rating, movie_id, rating)
+        return EnvelopeResponse(data, status_code=202)
+    data = await run_db(db, add_rating, movie_id, rating, idempotency_key)
+    return EnvelopeResponse(data, status_code=201)
 
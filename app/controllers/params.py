@@ -0,0 +1,9 @@
+"""Request parameter types shared by the routers."""
+from typing import Annotated
+
+from fastapi import Path
+
+from app.config import INT4_MAX
+
+# Primary keys in the path: serial int4 columns, so anything outside 1..INT4_MAX cannot exist
+PathId = Annotated[int, Path(ge=1, le=INT4_MAX)]
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("movie_rating")
+
+
+class RequestQueryStats:
+    """Statements run on behalf of one request: count, total time and the slowest one."""
+
+    __slots__ = ("count", "seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+
+class RouteQueryStats:
+    """Per-route totals of the request-level query stats, for the metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self.slow_queries = 0
+
+    def record(self, route: str, stats: RequestQueryStats) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0, "queries": 0, "db_seconds": 0.0, "max_queries": 0,
+                    "max_db_seconds": 0.0, "slowest_seconds": 0.0, "slowest_statement": None,
+                }
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["db_seconds"] += stats.seconds
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["max_db_seconds"] = max(entry["max_db_seconds"], stats.seconds)
+            if stats.slowest_seconds > entry["slowest_seconds"]:
+                entry["slowest_seconds"] = stats.slowest_seconds
+                entry["slowest_statement"] = stats.slowest_statement
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self.slow_queries += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {}
+            for route, entry in sorted(self._routes.items()):
+                requests = entry["requests"]
+                routes[route] = {
+                    "requests": requests,
+                    "queries": entry["queries"],
+                    "queries_per_request": round(entry["queries"] / requests, 2),
+                    "max_queries": entry["max_queries"],
+                    "db_ms_per_request": round(1000 * entry["db_seconds"] / requests, 3),
+                    "max_db_ms": round(1000 * entry["max_db_seconds"], 3),
+                    "slowest_statement_ms": round(1000 * entry["slowest_seconds"], 3),
+                    "slowest_statement": entry["slowest_statement"],
+                }
+            return {"slow_queries": self.slow_queries, "routes": routes}
+
+
+route_stats = RouteQueryStats()
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Statements slower than this are logged; None disables slow-query logging
+_slow_query_seconds: Optional[float] = None
+_log_parameters = True
+
+
+def begin_request() -> Tuple[RequestQueryStats, Token]:
+    """Start attributing statements run in this context (and threads/greenlets it spawns)."""
+    stats = RequestQueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _request_stats.reset(token)
+
+
+def configure_slow_query_log(threshold_ms: Optional[float], log_parameters: bool = True) -> None:
+    global _slow_query_seconds, _log_parameters
+    _slow_query_seconds = threshold_ms / 1000 if threshold_ms else None
+    _log_parameters = log_parameters
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds:
+        route_stats.record_slow_query()
+        if _log_parameters:
+            logger.warning("Slow query (%.1f ms): %s parameters=%r", 1000 * elapsed, statement, parameters)
+        else:
+            logger.warning("Slow query (%.1f ms): %s", 1000 * elapsed, statement)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements; drop their start time. Failed
+    # connects carry no cursor attribute at all.
+    if getattr(exception_context, "cursor", None) is None or exception_context.connection is None:
+        return
+    started = exception_context.connection.info.get("query_started")
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on `engine` (for an AsyncEngine pass its .sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, make_url
+
+from app.db.pool import pool_status
+
+logger = logging.getLogger("movie_rating")
+
+
+class Replica:
+    """One read replica: its engines and whether reads may currently be sent to it."""
+
+    def __init__(self, url: str, engine: Engine, async_engine=None):
+        # Shown in /internal/pool, so never with the password
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.down_since: Optional[float] = None
+
+    def status(self) -> Dict[str, Any]:
+        status = {
+            "url": self.name,
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "down_seconds": round(time.monotonic() - self.down_since, 1) if self.down_since is not None else None,
+            "sync": pool_status(self.engine.pool),
+        }
+        if self.async_engine is not None:
+            status["async"] = pool_status(self.async_engine.pool)
+        return status
+
+
+class ReplicaRouter:
+    """Round-robin over the healthy replicas; None from `pick` means read from the primary.
+
+    A replica is taken out of rotation as soon as one of its connections fails to connect or is
+    found disconnected, and a background thread probes every replica with SELECT 1 each
+    `check_interval` seconds, putting recovered ones back. Choosing a replica never does I/O.
+    """
+
+    def __init__(self, replicas: List[Replica], check_interval: float):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._stopping = threading.Event()
+        self._thread = None
+        self.fallbacks = 0
+        for replica in replicas:
+            self._watch(replica, replica.engine)
+            if replica.async_engine is not None:
+                self._watch(replica, replica.async_engine.sync_engine)
+
+    def _watch(self, replica: Replica, engine: Engine) -> None:
+        def handle_error(exception_context):
+            # No connection means the connect itself failed
+            if exception_context.is_disconnect or exception_context.connection is None:
+                self.mark_down(replica, exception_context.original_exception)
+
+        event.listen(engine, "handle_error", handle_error)
+
+    def pick(self) -> Optional[Replica]:
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+                if replica.healthy:
+                    return replica
+            if self.replicas:
+                self.fallbacks += 1
+            return None
+
+    def mark_down(self, replica: Replica, error: BaseException) -> None:
+        with self._lock:
+            replica.failures += 1
+            replica.last_error = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+            if not replica.healthy:
+                return
+            replica.healthy = False
+            replica.down_since = time.monotonic()
+        logger.warning("Read replica %s marked down: %s", replica.name, replica.last_error)
+
+    def check(self) -> None:
+        """Probe every replica once and update its health."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception as e:
+                # Connect failures were already counted by the handle_error hook
+                if replica.healthy:
+                    self.mark_down(replica, e)
+                continue
+            if not replica.healthy:
+                with self._lock:
+                    replica.healthy = True
+                    replica.down_since = None
+                logger.info("Read replica %s is back in rotation", replica.name)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.check_interval):
+            self.check()
+
+    def start(self) -> None:
+        """Probe the replicas once, so unreachable ones start out of rotation, then keep probing."""
+        if self._thread is not None or not self.replicas:
+            return
+        self.check()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(self.check_interval + 5)
+        self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "fallbacks_to_primary": self.fallbacks,
+            "replicas": [replica.status() for replica in self.replicas],
+        }
@@ -1,19 +1,181 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Tuple, Type, TypeVar, Union
+import logging
 import os
 from dotenv import load_dotenv
+from app.db.instrumentation import configure_slow_query_log, instrument_engine
+from app.db.pool import PoolStats, instrumented_pool_class
+from app.db.replicas import Replica, ReplicaRouter
 
 load_dotenv()
+logger = logging.getLogger("movie_rating")
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# DB_ASYNC=true serves requests through an asyncpg-backed AsyncSession instead of a
+# psycopg2 Session checked out on a worker thread.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+
+def _async_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Pool sizing is per engine and per worker process: budget
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) against Postgres max_connections.
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+}
+
+# Statements slower than SLOW_QUERY_MS are logged (0 disables), with their bound
+# parameters unless SLOW_QUERY_LOG_PARAMS=false
+configure_slow_query_log(
+    float(os.getenv("SLOW_QUERY_MS", "200")),
+    os.getenv("SLOW_QUERY_LOG_PARAMS", "true").lower() in ("1", "true", "yes"),
+)
+
+pool_stats = PoolStats()
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=instrumented_pool_class(QueuePool, pool_stats),
+    **POOL_OPTIONS
+)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+async_engine = None
+AsyncSessionLocal = None
+async_pool_stats = PoolStats()
+if DB_ASYNC:
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_stats),
+        **POOL_OPTIONS
+    )
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+# Comma-separated read replicas of DATABASE_URL. GET routes that only read (get_read_db) are
+# spread over them round-robin and fall back to the primary while none is healthy.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+
+# Errors that take a replica out of rotation when a read on it fails. asyncpg raises its own
+# exceptions, not wrapped in a DBAPIError, when it cannot connect.
+REPLICA_ERRORS: Tuple[Type[BaseException], ...] = (OperationalError,)
+if DB_ASYNC:
+    import asyncpg
+    REPLICA_ERRORS += (OSError, asyncpg.PostgresError)
+
+
+def _create_replica(url: str) -> Replica:
+    # Each replica gets pools sized like the primary's; its stats stay apart from the primary's
+    replica_engine = create_engine(url, poolclass=instrumented_pool_class(QueuePool, PoolStats()), **POOL_OPTIONS)
+    instrument_engine(replica_engine)
+    replica_async_engine = None
+    if DB_ASYNC:
+        replica_async_engine = create_async_engine(
+            _async_url(url), poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, PoolStats()), **POOL_OPTIONS
+        )
+        instrument_engine(replica_async_engine.sync_engine)
+    return Replica(url, replica_engine, replica_async_engine)
+
+
+replica_router = ReplicaRouter([_create_replica(url) for url in DATABASE_REPLICA_URLS], REPLICA_CHECK_INTERVAL)
+
+DbSession = Union[Session, AsyncSession]
+T = TypeVar("T")
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_session() -> Session:
+    """A Session on the next healthy replica, or on the primary when there is none."""
+    replica = replica_router.pick()
+    if replica is None:
+        return SessionLocal()
+    return SessionLocal(bind=replica.engine, info={"replica": replica})
+
+
+def reads_replica(db: Session) -> bool:
+    """Whether `db` reads from a replica, whose rows may lag the primary's."""
+    return "replica" in db.info
+
+
+def get_sync_read_db():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    replica = replica_router.pick()
+    if replica is None:
+        session = AsyncSessionLocal()
+    else:
+        session = AsyncSessionLocal(bind=replica.async_engine, info={"replica": replica})
+    async with session as db:
+        yield db
+
+
+# Request dependency for the configured stack; all writes, and reads that must see them, use get_db
+get_db = get_async_db if DB_ASYNC else get_sync_db
+# For read-only routes, which may lag the primary by the replicas' replication delay
+get_read_db = get_async_read_db if DB_ASYNC else get_sync_read_db
+
+
+async def _call(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call a repository/service function `fn(session, *args, **kwargs)` from an async route.
+
+    On an AsyncSession the function runs through `run_sync`, so its queries are awaited on
+    asyncpg without occupying a thread; a plain Session is handed to the threadpool as
+    FastAPI does for sync routes. When a read on a replica fails (REPLICA_ERRORS), the
+    replica is taken out of rotation and the call is retried once on the primary.
+    """
+    try:
+        return await _call(db, fn, *args, **kwargs)
+    except REPLICA_ERRORS as e:
+        replica = db.info.get("replica")
+        if replica is None:
+            raise
+        replica_router.mark_down(replica, e)
+        logger.warning("Read on replica %s failed; retrying on the primary", replica.name)
+    if isinstance(db, AsyncSession):
+        async with AsyncSessionLocal() as primary:
+            return await _call(primary, fn, *args, **kwargs)
+    primary = SessionLocal()
+    try:
+        return await _call(primary, fn, *args, **kwargs)
+    finally:
+        await run_in_threadpool(primary.close)
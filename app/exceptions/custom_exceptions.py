@@ -6,4 +6,12 @@ class NotFoundException(HTTPException):
 
 class ValidationException(HTTPException):
     def __init__(self, detail: str = "Validation error"):
-        super().__init__(status_code=422, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=422, detail=detail)
+
+class ConflictException(HTTPException):
+    def __init__(self, detail: str = "Conflict"):
+        super().__init__(status_code=409, detail=detail)
+
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail: str = "Service unavailable", retry_after: int = 1):
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
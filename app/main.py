@@ -1,13 +1,64 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from starlette.concurrency import run_in_threadpool
 from app.controllers.movie_controller import router as movie_router
-from app.exceptions.custom_exceptions import NotFoundException, ValidationException
+from app.controllers.leaderboard_controller import router as leaderboard_router
+from app.controllers.director_controller import router as director_router
+from app.controllers.genre_controller import router as genre_router
+from app.controllers.internal_controller import router as internal_router
+from app.controllers.metrics_controller import router as metrics_router
+from app.cache.dimensions import store as dimension_store
+from app.db.session import SessionLocal, async_engine, replica_router
+from app.config import RATING_INGEST_MODE, SERVER_TIMING
+from app.exceptions.custom_exceptions import NotFoundException, ValidationException, ConflictException, ServiceUnavailableException
 from app.logging import setup_logging
+from app.middleware import MetricsMiddleware, QueryStatsMiddleware, RequestIdMiddleware
+from app.services import rating_ingest
+import logging
 
-app = FastAPI()
+logger = logging.getLogger("movie_rating")
+
+def _load_dimensions():
+    db = SessionLocal()
+    try:
+        dimension_store.refresh(db)
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await run_in_threadpool(_load_dimensions)
+    except Exception:
+        # Not fatal: the first request that needs the snapshot loads it
+        logger.warning("Could not preload directors and genres", exc_info=True)
+    if RATING_INGEST_MODE == "buffered":
+        rating_ingest.buffer.start()
+    await run_in_threadpool(replica_router.start)
+    yield
+    # Flush queued ratings before the engines go away
+    await run_in_threadpool(rating_ingest.buffer.stop)
+    await run_in_threadpool(replica_router.stop)
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in replica_router.replicas:
+        if replica.async_engine is not None:
+            await replica.async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 setup_logging()
+app.add_middleware(QueryStatsMiddleware, server_timing=SERVER_TIMING)
+app.add_middleware(RequestIdMiddleware)
+# Added last so it wraps (and times) everything else
+app.add_middleware(MetricsMiddleware)
 app.include_router(movie_router)
+app.include_router(leaderboard_router)
+app.include_router(director_router)
+app.include_router(genre_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
 
 @app.exception_handler(NotFoundException)
 async def not_found_exception_handler(request: Request, exc: NotFoundException):
@@ -23,6 +74,21 @@ async def validation_exception_handler(request: Request, exc: ValidationExceptio
         content={"status": "failure", "error": {"code": exc.status_code, "message": exc.detail}},
     )
 
+@app.exception_handler(ConflictException)
+async def conflict_exception_handler(request: Request, exc: ConflictException):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"status": "failure", "error": {"code": exc.status_code, "message": exc.detail}},
+    )
+
+@app.exception_handler(ServiceUnavailableException)
+async def service_unavailable_exception_handler(request: Request, exc: ServiceUnavailableException):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"status": "failure", "error": {"code": exc.status_code, "message": exc.detail}},
+        headers=exc.headers,
+    )
+
 @app.exception_handler(RequestValidationError)
 async def validation_error_handler(request: Request, exc: RequestValidationError):
     return JSONResponse(
@@ -0,0 +1,169 @@
+"""Prometheus text-format metrics: per-route request histograms plus pool, cache and ingest state."""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+from app.cache import movie_cache
+from app.db.instrumentation import route_stats
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine
+from app.services import rating_ingest
+
+# Upper bounds in seconds; the implicit last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_BUCKET_LABELS = [repr(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+
+
+class Histogram:
+    """One latency series. Bucket counts are stored per bucket and accumulated on render."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class RequestMetrics:
+    """Request histograms keyed route -> method -> status.
+
+    Nested dicts keyed by values the request already carries (the route's template string, the
+    scope's method and the integer status), so recording a request allocates nothing once its
+    series exists. Only called from the event loop, so no lock is needed.
+    """
+
+    def __init__(self):
+        self._series: Dict[str, Dict[str, Dict[int, Histogram]]] = {}
+
+    def observe(self, route: str, method: str, status: int, seconds: float) -> None:
+        by_method = self._series.get(route)
+        if by_method is None:
+            by_method = self._series[route] = {}
+        by_status = by_method.get(method)
+        if by_status is None:
+            by_status = by_method[method] = {}
+        histogram = by_status.get(status)
+        if histogram is None:
+            histogram = by_status[status] = Histogram()
+        histogram.observe(seconds)
+
+    def series(self) -> Iterable[Tuple[str, str, int, Histogram]]:
+        for route, by_method in sorted(self._series.items()):
+            for method, by_status in sorted(by_method.items()):
+                for status, histogram in sorted(by_status.items()):
+                    yield route, method, status, histogram
+
+
+request_metrics = RequestMetrics()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, labels: str = "") -> None:
+        self.lines.append(f"{name}{labels} {value}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _render_requests(out: _Writer) -> None:
+    series = list(request_metrics.series())
+    out.family("http_requests_total", "counter", "HTTP requests by route template, method and status.")
+    for route, method, status, histogram in series:
+        out.sample("http_requests_total", histogram.count, _labels(method=method, route=route, status=status))
+    out.family("http_request_duration_seconds", "histogram", "HTTP request latency by route template, method and status.")
+    for route, method, status, histogram in series:
+        cumulative = 0
+        for bucket, count in zip(_BUCKET_LABELS, histogram.counts):
+            cumulative += count
+            out.sample(
+                "http_request_duration_seconds_bucket",
+                cumulative,
+                _labels(method=method, route=route, status=status, le=bucket),
+            )
+        labels = _labels(method=method, route=route, status=status)
+        out.sample("http_request_duration_seconds_sum", repr(histogram.sum), labels)
+        out.sample("http_request_duration_seconds_count", histogram.count, labels)
+
+
+def _render_queries(out: _Writer) -> None:
+    snapshot = route_stats.snapshot()
+    out.family("db_queries_total", "counter", "SQL statements run by requests, by route template.")
+    for route, stats in snapshot["routes"].items():
+        method, _, path = route.partition(" ")
+        out.sample("db_queries_total", stats["queries"], _labels(method=method, route=path))
+    out.family("db_slow_queries_total", "counter", "SQL statements slower than SLOW_QUERY_MS.")
+    out.sample("db_slow_queries_total", snapshot["slow_queries"])
+
+
+def _render_pools(out: _Writer) -> None:
+    pools = [("sync", pool_status(engine.pool))]
+    if async_engine is not None:
+        pools.append(("async", pool_status(async_engine.pool)))
+    gauges = [
+        ("db_pool_size", "size", "Configured pool size."),
+        ("db_pool_checked_out", "checked_out", "Connections currently checked out."),
+        ("db_pool_idle", "idle", "Idle connections in the pool."),
+        ("db_pool_overflow", "overflow", "Connections open beyond the pool size."),
+    ]
+    counters = [
+        ("db_pool_checkouts_total", "checkouts", "Successful connection checkouts."),
+        ("db_pool_timeouts_total", "timeouts", "Checkouts that timed out waiting for a connection."),
+        ("db_pool_wait_seconds_total", "wait_seconds_total", "Time spent waiting for connections."),
+    ]
+    for kind, entries in (("gauge", gauges), ("counter", counters)):
+        for name, key, help_text in entries:
+            out.family(name, kind, help_text)
+            for engine_name, status in pools:
+                out.sample(name, status[key], _labels(engine=engine_name))
+
+
+def _render_cache(out: _Writer) -> None:
+    stats = movie_cache.stats()
+    labels = _labels(backend=stats["backend"])
+    for key in ("hits", "misses", "evictions", "expirations", "deletes"):
+        name = f"cache_{key}_total"
+        out.family(name, "counter", f"Response cache {key}.")
+        out.sample(name, stats.get(key, 0), labels)
+    out.family("cache_entries", "gauge", "Entries held by the response cache.")
+    out.sample("cache_entries", stats.get("entries", 0), labels)
+
+
+def _render_rating_ingest(out: _Writer) -> None:
+    stats = rating_ingest.buffer.stats()
+    for key in ("accepted", "rejected", "written", "skipped", "failed", "retries", "batches"):
+        name = f"rating_ingest_{key}_total"
+        out.family(name, "counter", f"Buffered rating ingestion: {key}.")
+        out.sample(name, stats[key])
+    out.family("rating_ingest_pending", "gauge", "Ratings queued and not yet written.")
+    out.sample("rating_ingest_pending", stats["pending"])
+    out.family("rating_ingest_running", "gauge", "1 while the background writer runs.")
+    out.sample("rating_ingest_running", int(stats["running"]))
+
+
+def render() -> str:
+    out = _Writer()
+    _render_requests(out)
+    _render_queries(out)
+    _render_pools(out)
+    _render_cache(out)
+    _render_rating_ingest(out)
+    return out.text()
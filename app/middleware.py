@@ -0,0 +1,118 @@
+import re
+import time
+import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.db.instrumentation import begin_request, end_request, route_stats
+from app.logging import request_id
+from app.metrics import request_metrics
+
+
+def _route_path(scope: Scope) -> str:
+    # Set by the router once a route matched; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _route_template(scope: Scope) -> str:
+    return f"{scope['method']} {_route_path(scope)}"
+
+
+class QueryStatsMiddleware:
+    """Attribute SQL statements to the request that ran them.
+
+    Adds a Server-Timing header (db time and query count, slowest statement, total app time)
+    and folds each request into the per-route totals served by /internal/queries. Plain ASGI
+    rather than BaseHTTPMiddleware, so the request runs in this context and nothing is buffered.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats, token = begin_request()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                app_ms = 1000 * (time.perf_counter() - started)
+                timing = (
+                    f'db;dur={1000 * stats.seconds:.3f};desc="{stats.count} queries", '
+                    f"db-slowest;dur={1000 * stats.slowest_seconds:.3f}, "
+                    f"app;dur={app_ms:.3f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            route_stats.record(_route_template(scope), stats)
+
+
+class MetricsMiddleware:
+    """Record every request's latency in the per-route histograms served at /metrics."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.observe(_route_path(scope), scope["method"], status, time.perf_counter() - started)
+
+
+# Accept caller-supplied ids that are short and header/log safe; anything else gets a fresh one
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """Tag each request with an id (X-Request-ID from the caller or a new one) for log lines.
+
+    The id is echoed back in the X-Request-ID response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        current = incoming if incoming and _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(current)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", current.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, String
+from app.db.session import Base
+
+# Dimension tables whose changes are counted in dimension_versions
+DIRECTORS = "directors"
+GENRES = "genres"
+
+
+class DimensionVersion(Base):
+    """Change counter of a dimension table, bumped by a statement-level trigger on every write.
+
+    See the a7d3e5f1c9b2 migration; the in-process snapshot in app.cache.dimensions reloads when it moves.
+    """
+    __tablename__ = "dimension_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from app.db.session import Base
+
+# Boards a movie is ranked on; board_key is 0, the genre id or the release year
+BOARD_ALL = "all"
+BOARD_GENRE = "genre"
+BOARD_YEAR = "year"
+
+
+class LeaderboardEntry(Base):
+    """A movie's standing on one board, denormalized so each board is a single index range scan.
+
+    Every movie has an entry on the overall board, one per genre and one for its release year.
+    Kept in step with movies, movie_genres and movie_rating_stats by leaderboard_repository.
+    """
+    __tablename__ = "leaderboard_entries"
+
+    board = Column(String(8), primary_key=True)
+    board_key = Column(Integer, primary_key=True)
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True, index=True)
+    weighted_score = Column(DOUBLE_PRECISION, nullable=False)
+    ratings_count = Column(Integer, nullable=False, default=0, server_default="0")
+    trend = Column(DOUBLE_PRECISION)
+
+
+Index(
+    "ix_leaderboard_entries_top",
+    LeaderboardEntry.board, LeaderboardEntry.board_key, LeaderboardEntry.weighted_score.desc(), LeaderboardEntry.movie_id,
+)
+Index(
+    "ix_leaderboard_entries_trending",
+    LeaderboardEntry.board, LeaderboardEntry.board_key, LeaderboardEntry.trend.desc().nulls_last(), LeaderboardEntry.movie_id,
+)
@@ -1,18 +1,30 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.db.session import Base
 
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (
+        Index("ix_movies_title_id", "title", "id"),
+        Index("ix_movies_release_year_id", "release_year", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True, nullable=False)
+    title = Column(String, nullable=False)
     release_year = Column(Integer)
     cast = Column(String)
-    director_id = Column(Integer, ForeignKey("directors.id", ondelete="CASCADE"), nullable=False)
-   
+    director_id = Column(Integer, ForeignKey("directors.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Maintained by Postgres for full-text search; deferred so normal loads skip it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(\"cast\", ''))", persisted=True),
+    ))
 
     director = relationship("Director", back_populates="movies")
     genres = relationship("Genre", secondary="movie_genres", back_populates="movies")
     ratings = relationship("MovieRating", back_populates="movie", cascade="all, delete")
+    rating_stats = relationship("MovieRatingStats", back_populates="movie", uselist=False, cascade="all, delete", passive_deletes=True)
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from app.db.session import Base
 
 class MovieGenre(Base):
     __tablename__ = "movie_genres"
+    __table_args__ = (Index("ix_movie_genres_genre_id_movie_id", "genre_id", "movie_id"),)
 
     movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
     genre_id = Column(Integer, ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
\ No newline at end of file
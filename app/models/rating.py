@@ -1,12 +1,21 @@
-from sqlalchemy import Column, Integer, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class MovieRating(Base):
     __tablename__ = "movie_ratings"
+    __table_args__ = (
+        Index("ix_movie_ratings_movie_id_score", "movie_id", "score"),
+        # One vote per user and movie; anonymous ratings (NULL user_id) are not deduplicated
+        UniqueConstraint("movie_id", "user_id", name="uq_movie_ratings_movie_id_user_id"),
+        UniqueConstraint("idempotency_key", name="uq_movie_ratings_idempotency_key"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"))
     score = Column(Integer, CheckConstraint("score >= 1 AND score <= 10"))
+    user_id = Column(String(64))
+    # Idempotency-Key of the request that created the rating; a retry with the same key is a replay
+    idempotency_key = Column(String(255))
 
     movie = relationship("Movie", back_populates="ratings")
\ No newline at end of file
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.session import Base
+
+SCORE_RANGE = range(1, 11)
+
+
+class MovieRatingStats(Base):
+    """Per-movie rating aggregates, maintained on every rating write."""
+    __tablename__ = "movie_rating_stats"
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    ratings_sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+    ratings_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_1_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_2_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_3_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_4_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_5_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_6_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_7_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_8_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_9_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_10_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # ln of the exponentially decayed rating count, scaled to a fixed epoch (see rating_repository)
+    trend = Column(DOUBLE_PRECISION)
+
+    movie = relationship("Movie", back_populates="rating_stats")
+
+    @staticmethod
+    def score_column(score: int) -> str:
+        return f"score_{score}_count"
+
+    @property
+    def histogram(self) -> list:
+        return [getattr(self, self.score_column(score)) for score in SCORE_RANGE]
@@ -0,0 +1,20 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.dimension_version import DimensionVersion, DIRECTORS, GENRES
+from app.models.director import Director
+from app.models.genre import Genre
+from typing import List, Tuple
+
+def get_dimension_versions(db: Session) -> Tuple[int, int]:
+    """(directors version, genres version) from the trigger-maintained counters."""
+    versions = dict(db.execute(select(DimensionVersion.name, DimensionVersion.version)).all())
+    return versions.get(DIRECTORS, 0), versions.get(GENRES, 0)
+
+def load_directors(db: Session) -> List[Row]:
+    return db.execute(
+        select(Director.id, Director.name, Director.birth_year, Director.description).order_by(Director.id)
+    ).all()
+
+def load_genres(db: Session) -> List[Row]:
+    return db.execute(select(Genre.id, Genre.name, Genre.description).order_by(Genre.id)).all()
@@ -0,0 +1,80 @@
+from sqlalchemy import Float, cast, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+from app.config import LEADERBOARD_PRIOR_MEAN, LEADERBOARD_PRIOR_VOTES
+from app.models.leaderboard import BOARD_ALL, BOARD_GENRE, BOARD_YEAR, LeaderboardEntry
+from app.models.movie import Movie
+from app.models.movie_genre import MovieGenre
+from app.models.rating_stats import MovieRatingStats
+
+ENTRY_COLUMNS = ["board", "board_key", "movie_id", "weighted_score", "ratings_count", "trend"]
+
+
+def weighted_score(ratings_sum, ratings_count):
+    """Bayesian average: (sum + m * C) / (count + m) with m = PRIOR_VOTES and C = PRIOR_MEAN."""
+    return (
+        (cast(func.coalesce(ratings_sum, 0), Float(53)) + LEADERBOARD_PRIOR_VOTES * LEADERBOARD_PRIOR_MEAN)
+        / (func.coalesce(ratings_count, 0) + LEADERBOARD_PRIOR_VOTES)
+    )
+
+
+def _entries(movie_ids: Optional[Iterable[int]]):
+    """SELECT of every (board, board_key, movie) entry for `movie_ids`, or for all movies."""
+    score_columns = (
+        weighted_score(MovieRatingStats.ratings_sum, MovieRatingStats.ratings_count),
+        func.coalesce(MovieRatingStats.ratings_count, 0),
+        MovieRatingStats.trend,
+    )
+
+    def board(name, key):
+        stmt = (
+            select(literal(name), key, Movie.id, *score_columns)
+            .select_from(Movie)
+            .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        )
+        if movie_ids is not None:
+            stmt = stmt.where(Movie.id.in_(movie_ids))
+        return stmt
+
+    overall = board(BOARD_ALL, literal(0))
+    genres = board(BOARD_GENRE, MovieGenre.genre_id).join(MovieGenre, MovieGenre.movie_id == Movie.id)
+    years = board(BOARD_YEAR, Movie.release_year).where(Movie.release_year.isnot(None))
+    return union_all(overall, genres, years)
+
+
+def sync_movies(db: Session, movie_ids: Iterable[int]) -> None:
+    """Rewrite the movies' entries after they were created or their genres or release year changed.
+
+    Runs in the caller's transaction; pending ORM changes must be flushed first.
+    """
+    movie_ids = list(movie_ids)
+    if not movie_ids:
+        return
+    db.execute(delete(LeaderboardEntry).where(LeaderboardEntry.movie_id.in_(movie_ids)))
+    db.execute(insert(LeaderboardEntry).from_select(ENTRY_COLUMNS, _entries(movie_ids)))
+
+
+def refresh_scores(db: Session, movie_ids: Iterable[int]) -> None:
+    """Copy the movies' current rating stats onto all of their entries with one UPDATE."""
+    movie_ids = sorted(set(movie_ids))
+    if not movie_ids:
+        return
+    db.execute(
+        update(LeaderboardEntry)
+        .where(LeaderboardEntry.movie_id == MovieRatingStats.movie_id, MovieRatingStats.movie_id.in_(movie_ids))
+        .values(
+            weighted_score=weighted_score(MovieRatingStats.ratings_sum, MovieRatingStats.ratings_count),
+            ratings_count=MovieRatingStats.ratings_count,
+            trend=MovieRatingStats.trend,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every entry from scratch, e.g. after changing the leaderboard prior. Returns the entry count."""
+    db.execute(delete(LeaderboardEntry))
+    db.execute(insert(LeaderboardEntry).from_select(ENTRY_COLUMNS, _entries(None)))
+    count = db.scalar(select(func.count()).select_from(LeaderboardEntry))
+    db.commit()
+    return count
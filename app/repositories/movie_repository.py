@@ -1,11 +1,309 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy import Numeric, and_, cast, delete, exists, func, insert, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, aggregate_order_by
+from app.models.director import Director
 from app.models.movie import Movie
 from app.models.genre import Genre
 from app.models.rating import MovieRating
+from app.models.rating_stats import MovieRatingStats
 from app.models.movie_genre import MovieGenre
+from app.models.leaderboard import LeaderboardEntry
+from app.repositories import leaderboard_repository
 from app.schemas.movie import MovieCreate, MovieUpdate
-from typing import List, Optional, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
+from decimal import Decimal
+
+# (movie, average rating, ratings count, genre ids); director and genre names come from the
+# in-process dimension snapshot (app.cache.dimensions)
+MovieRow = Tuple[Movie, float, int, List[int]]
+
+# Sort orders accepted by get_movies; every order is made total by breaking ties on Movie.id.
+# "relevance" ranks matches of a search query `q`.
+SORT_KEYS = ("id", "title", "average_rating", "relevance")
+
+# How a multi-genre filter combines: movies in any of the genres, or in all of them
+GENRE_MATCHES = ("any", "all")
+
+# Text search configuration of movies.search_vector (see the 233363b29d1e migration)
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _average_rating():
+    return func.coalesce(
+        cast(MovieRatingStats.ratings_sum, Numeric) / func.nullif(MovieRatingStats.ratings_count, 0), 0
+    )
+
+
+def _search_query(q: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def _relevance(q: str):
+    """Full-text rank over title and cast plus trigram word similarity against the title.
+
+    Both functions return real; the sum is computed in double precision so the value that ends up in
+    a cursor round-trips exactly and keyset comparisons against it stay stable.
+    """
+    return (
+        cast(func.ts_rank(Movie.search_vector, _search_query(q)), DOUBLE_PRECISION)
+        + cast(func.word_similarity(q, Movie.title), DOUBLE_PRECISION)
+    )
+
+
+def _in_genres(genre_ids: Sequence[int]):
+    # Semi-join: probes ix_movie_genres_genre_id_movie_id (or the primary key) per movie and
+    # never multiplies movie rows, so no DISTINCT is needed
+    return exists().where(MovieGenre.movie_id == Movie.id, MovieGenre.genre_id.in_(genre_ids))
+
+
+def _movie_filters(
+    title: Optional[str],
+    release_year: Optional[int],
+    genre_ids: Optional[Sequence[int]],
+    q: Optional[str] = None,
+    director_id: Optional[int] = None,
+    genre_match: str = "any"
+) -> list:
+    filters = []
+    if q:
+        # Either side can use its GIN index (search_vector / gin_trgm_ops on title)
+        filters.append(or_(Movie.search_vector.op("@@")(_search_query(q)), literal(q).op("<%")(Movie.title)))
+    if title:
+        filters.append(Movie.title.ilike(f"%{title}%"))
+    if release_year is not None:
+        filters.append(Movie.release_year == release_year)
+    if genre_ids is not None:
+        if genre_match == "all" and genre_ids:
+            filters.extend(_in_genres([genre_id]) for genre_id in dict.fromkeys(genre_ids))
+        else:
+            filters.append(_in_genres(list(genre_ids)))
+    if director_id is not None:
+        filters.append(Movie.director_id == director_id)
+    return filters
+
+
+def _sort_key(sort: str, q: Optional[str] = None):
+    """Return (expression, descending) for the leading sort column, or None when sorting by id only."""
+    if sort == "title":
+        return Movie.title, False
+    if sort == "average_rating":
+        return _average_rating(), True
+    if sort == "relevance":
+        return _relevance(q), True
+    return None
+
+
+def _after_key(sort: str, after: tuple, q: Optional[str] = None):
+    """Keyset predicate selecting the rows that sort strictly after `after` = (sort_value, id)."""
+    value, last_id = after
+    if sort == "title":
+        return tuple_(Movie.title, Movie.id) > tuple_(value, last_id)
+    if sort in ("average_rating", "relevance"):
+        expression = _average_rating() if sort == "average_rating" else _relevance(q)
+        value = Decimal(value) if sort == "average_rating" else float(value)
+        return or_(expression < value, and_(expression == value, Movie.id > last_id))
+    return Movie.id > last_id
+
+
+def _with_aggregates(movie_ids, *order_by):
+    """Select the movies in `movie_ids` together with their genre ids and rating aggregates.
+
+    Rating aggregates are read from the precomputed movie_rating_stats row and genre ids come
+    from a correlated ARRAY_AGG over the movie_genres primary key, so the whole page is assembled
+    by Postgres in a single statement without touching the directors or genres tables.
+    """
+    genre_ids = (
+        select(func.array_agg(MovieGenre.genre_id))
+        .where(MovieGenre.movie_id == movie_ids.c.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Movie,
+            _average_rating().label("average_rating"),
+            func.coalesce(MovieRatingStats.ratings_count, 0).label("ratings_count"),
+            genre_ids.label("genre_ids"),
+        )
+        .join(movie_ids, movie_ids.c.id == Movie.id)
+        .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        .order_by(*(order_by or (Movie.id,)))
+    )
+
+
+def _to_movie_row(row) -> MovieRow:
+    return row.Movie, row.average_rating, row.ratings_count, row.genre_ids or []
+
+
+def get_movies(
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    title: Optional[str] = None,
+    release_year: Optional[int] = None,
+    genre_ids: Optional[Sequence[int]] = None,
+    sort: str = "id",
+    after: Optional[tuple] = None,
+    include_total: bool = True,
+    q: Optional[str] = None,
+    director_id: Optional[int] = None,
+    genre_match: str = "any"
+) -> Tuple[Optional[int], List[MovieRow], Optional[tuple]]:
+    """Return (total, rows, next_key) for one page of movies.
+
+    With `after` set the page starts right after that (sort_value, id) key instead of at an
+    OFFSET. `next_key` is the key of the last row when more rows follow, otherwise None.
+    `total` is None when `include_total` is False. `q` restricts the page to full-text or
+    trigram matches and is required for sort="relevance". `genre_ids` keeps movies in any
+    (genre_match="any") or all ("all") of the genres; an empty list matches nothing.
+    """
+    filters = _movie_filters(title, release_year, genre_ids, q, director_id, genre_match)
+    sort_key = _sort_key(sort, q)
+    columns = [Movie.id]
+    ordering = [Movie.id]
+    if sort_key is not None:
+        expression, descending = sort_key
+        columns.append(expression.label("sort_value"))
+        ordering.insert(0, expression.desc() if descending else expression)
+    # On offset pages the total rides along as a window count over the filtered ids, so the
+    # page and the total come back from the same scan.
+    with_window_total = include_total and after is None
+    if with_window_total:
+        columns.append(func.count().over().label("total"))
+
+    page_query = select(*columns).where(*filters)
+    if sort == "average_rating":
+        page_query = page_query.outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+    if after is not None:
+        page_query = page_query.where(_after_key(sort, after, q))
+    else:
+        page_query = page_query.offset((page - 1) * page_size)
+    # One extra row tells whether there is a next page
+    page_ids = page_query.order_by(*ordering).limit(page_size + 1).subquery("page_ids")
+
+    outer_ordering = [page_ids.c.id]
+    if sort_key is not None:
+        outer_ordering.insert(0, page_ids.c.sort_value.desc() if sort_key[1] else page_ids.c.sort_value)
+    stmt = _with_aggregates(page_ids, *outer_ordering)
+    if sort_key is not None:
+        stmt = stmt.add_columns(page_ids.c.sort_value)
+    if with_window_total:
+        stmt = stmt.add_columns(page_ids.c.total)
+    rows = db.execute(stmt).all()
+
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_key = (last.sort_value if sort_key is not None else None, last.Movie.id)
+
+    total = None
+    if with_window_total and rows:
+        total = rows[0].total
+    elif include_total and (after is not None or page > 1):
+        # Keyset pages and pages past the end have no row carrying the full window count
+        total = db.scalar(select(func.count(Movie.id)).where(*filters))
+    elif include_total:
+        total = 0
+    return total, [_to_movie_row(row) for row in rows], next_key
+
+
+def get_movie_by_id(db: Session, movie_id: int) -> Optional[Tuple[MovieRow, Optional[datetime]]]:
+    """The movie's row plus when its ratings last changed, which the detail's validators need."""
+    movie_ids = select(Movie.id).where(Movie.id == movie_id).subquery("movie_ids")
+    stmt = _with_aggregates(movie_ids).add_columns(MovieRatingStats.updated_at.label("ratings_updated_at"))
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+    return _to_movie_row(row), row.ratings_updated_at
+
+
+def get_movies_by_ids(db: Session, movie_ids: List[int]) -> Dict[int, MovieRow]:
+    """Load many movies with their aggregates in one statement, keyed by id; missing ids are absent."""
+    if not movie_ids:
+        return {}
+    ids = select(Movie.id).where(Movie.id.in_(movie_ids)).subquery("movie_ids")
+    return {row.Movie.id: _to_movie_row(row) for row in db.execute(_with_aggregates(ids))}
+
+
+def iter_movies_for_export(db: Session, batch_size: int = 1000) -> Iterator[Row]:
+    """Stream every movie with director, genres and rating stats through a server-side cursor.
+
+    Rows are plain column tuples (no ORM identity map), fetched `batch_size` at a time from a
+    single statement, so memory stays flat and the export reads one consistent snapshot.
+    """
+    genre_names = (
+        select(func.array_agg(aggregate_order_by(Genre.name, Genre.name)))
+        .join(MovieGenre, MovieGenre.genre_id == Genre.id)
+        .where(MovieGenre.movie_id == Movie.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Movie.id,
+            Movie.title,
+            Movie.release_year,
+            Movie.cast,
+            Movie.updated_at,
+            Director.id.label("director_id"),
+            Director.name.label("director_name"),
+            genre_names.label("genres"),
+            _average_rating().label("average_rating"),
+            func.coalesce(MovieRatingStats.ratings_count, 0).label("ratings_count"),
+        )
+        .join(Director, Director.id == Movie.director_id)
+        .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        .order_by(Movie.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(stmt)
+
+
+def get_leaderboard(
+    db: Session, board: str, board_key: int, trending: bool, limit: int, min_votes: int = 0
+) -> List[Tuple[MovieRow, float]]:
+    """Top `limit` movies of one leaderboard as (movie row, weighted score), best first.
+
+    The board's entries are read in index order (weighted_score, or trend for `trending`), so
+    only the returned movies are looked at.
+    """
+    rank = LeaderboardEntry.trend.desc().nulls_last() if trending else LeaderboardEntry.weighted_score.desc()
+    ranked = (
+        select(
+            LeaderboardEntry.movie_id.label("id"),
+            LeaderboardEntry.weighted_score,
+            func.row_number().over(order_by=(rank, LeaderboardEntry.movie_id)).label("rank"),
+        )
+        .where(LeaderboardEntry.board == board, LeaderboardEntry.board_key == board_key)
+        .order_by(rank, LeaderboardEntry.movie_id)
+        .limit(limit)
+    )
+    if trending:
+        ranked = ranked.where(LeaderboardEntry.trend.isnot(None))
+    if min_votes:
+        ranked = ranked.where(LeaderboardEntry.ratings_count >= min_votes)
+    ranked = ranked.subquery("ranked")
+    rows = db.execute(_with_aggregates(ranked, ranked.c.rank).add_columns(ranked.c.weighted_score)).all()
+    return [(_to_movie_row(row), row.weighted_score) for row in rows]
+
+
+def get_movie_version(db: Session, movie_id: int) -> Optional[Row]:
+    """(updated_at, ratings_updated_at, ratings_count) for a movie: two primary-key lookups, no aggregates."""
+    stmt = (
+        select(
+            Movie.updated_at,
+            MovieRatingStats.updated_at.label("ratings_updated_at"),
+            func.coalesce(MovieRatingStats.ratings_count, 0).label("ratings_count"),
+        )
+        .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        .where(Movie.id == movie_id)
+    )
+    return db.execute(stmt).first()
+
+
+def movie_exists(db: Session, movie_id: int) -> bool:
+    return db.scalar(select(exists().where(Movie.id == movie_id)))
 
 
 def create_movie(db: Session, movie: MovieCreate) -> Movie:
@@ -16,15 +314,43 @@ def create_movie(db: Session, movie: MovieCreate) -> Movie:
         director_id=movie.director_id
     )
     db.add(db_movie)
-    db.commit()
-    db.refresh(db_movie)
+    db.flush()
 
-    for genre_id in movie.genres:
-        db.add(MovieGenre(movie_id=db_movie.id, genre_id=genre_id))
+    genre_ids = list(dict.fromkeys(movie.genres))
+    if genre_ids:
+        db.execute(insert(MovieGenre), [{"movie_id": db_movie.id, "genre_id": genre_id} for genre_id in genre_ids])
+    leaderboard_repository.sync_movies(db, [db_movie.id])
     db.commit()
     db.refresh(db_movie)
     return db_movie
 
+def create_movies_bulk(db: Session, movies: List[MovieCreate]) -> List[int]:
+    """Insert movies and their genre links with two batched statements; returns ids in input order."""
+    if not movies:
+        return []
+    movie_ids = db.scalars(
+        insert(Movie).returning(Movie.id, sort_by_parameter_order=True),
+        [
+            {
+                "title": movie.title,
+                "release_year": movie.release_year,
+                "cast": movie.cast,
+                "director_id": movie.director_id,
+            }
+            for movie in movies
+        ],
+    ).all()
+    links = [
+        {"movie_id": movie_id, "genre_id": genre_id}
+        for movie_id, movie in zip(movie_ids, movies)
+        for genre_id in dict.fromkeys(movie.genres)
+    ]
+    if links:
+        db.execute(insert(MovieGenre), links)
+    leaderboard_repository.sync_movies(db, movie_ids)
+    db.commit()
+    return list(movie_ids)
+
 def update_movie(db: Session, movie_id: int, movie_update: MovieUpdate) -> Optional[Movie]:
     db_movie = db.query(Movie).filter(Movie.id == movie_id).first()
     if not db_movie:
@@ -36,10 +362,21 @@ def update_movie(db: Session, movie_id: int, movie_update: MovieUpdate) -> Optio
             setattr(db_movie, key, value)
 
     if "genres" in update_data:
-        db.query(MovieGenre).filter(MovieGenre.movie_id == movie_id).delete()
-        for genre_id in movie_update.genres:
-            db.add(MovieGenre(movie_id=movie_id, genre_id=genre_id))
+        # Only touch the links that actually change
+        wanted = set(movie_update.genres or [])
+        current = set(db.scalars(select(MovieGenre.genre_id).where(MovieGenre.movie_id == movie_id)))
+        removed, added = current - wanted, wanted - current
+        if removed:
+            db.execute(delete(MovieGenre).where(MovieGenre.movie_id == movie_id, MovieGenre.genre_id.in_(removed)))
+        if added:
+            db.execute(insert(MovieGenre), [{"movie_id": movie_id, "genre_id": genre_id} for genre_id in sorted(added)])
+        if removed or added:
+            # A genre-only change does not touch the movies row, so bump updated_at explicitly
+            db_movie.updated_at = datetime.utcnow()
 
+    if "genres" in update_data or "release_year" in update_data:
+        db.flush()
+        leaderboard_repository.sync_movies(db, [movie_id])
     db.commit()
     db.refresh(db_movie)
     return db_movie
@@ -1,9 +1,182 @@
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+from app.config import TRENDING_HALF_LIFE_HOURS
+from app.models.movie import Movie
 from app.models.rating import MovieRating
+from app.models.rating_stats import MovieRatingStats, SCORE_RANGE
+from app.repositories import leaderboard_repository
+
+# Trend is ln(sum over ratings of e^(decay * (rated_at - TREND_EPOCH))). Every movie decays at the
+# same rate, so the stored value ranks movies as the decayed count would at any moment, and a
+# rating only adds to it; the log keeps the growing exponent in range.
+TREND_EPOCH = datetime(2020, 1, 1)
+TREND_DECAY = math.log(2) / (TRENDING_HALF_LIFE_HOURS * 3600)
+
+# A per-user upsert re-reads the user's vote and retries when another request inserted it first
+UPSERT_ATTEMPTS = 3
+
+
+def _trend_increment(now: datetime, ratings: int) -> float:
+    return TREND_DECAY * (now - TREND_EPOCH).total_seconds() + math.log(ratings)
+
+
+def _log_add(current, increment):
+    # ln(e^current + e^increment) without overflowing; current is NULL before the first rating
+    # and increment is NULL when no rating was added (only changed votes)
+    larger = func.greatest(current, increment)
+    return case(
+        (current.is_(None), increment),
+        (increment.is_(None), current),
+        else_=larger + func.ln(1 + func.exp(-func.abs(current - increment))),
+    )
+
+
+def _apply_stats(
+    db: Session, scores: Iterable[Tuple[int, int]], replaced: Iterable[Tuple[int, int]] = ()
+) -> None:
+    """Fold (movie_id, score) pairs into the movies' stats rows with one multi-row upsert.
+
+    `replaced` lists (movie_id, old_score) votes that `scores` overwrite; they are taken back
+    out, so a changed vote moves the sum and histogram without adding to the count or trend.
+    """
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for sign, pairs in ((1, scores), (-1, replaced)):
+        for movie_id, score in pairs:
+            delta = deltas[movie_id]
+            delta["ratings_sum"] += sign * score
+            delta["ratings_count"] += sign
+            delta[MovieRatingStats.score_column(score)] += sign
+    deltas = {movie_id: delta for movie_id, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+    counter_columns = ["ratings_sum", "ratings_count"] + [MovieRatingStats.score_column(s) for s in SCORE_RANGE]
+    now = datetime.utcnow()
+    # Sorted by movie_id so concurrent flushes lock stats rows in the same order
+    values = [
+        {
+            "movie_id": movie_id, "updated_at": now,
+            "trend": _trend_increment(now, delta["ratings_count"]) if delta["ratings_count"] > 0 else None,
+            **{column: delta[column] for column in counter_columns},
+        }
+        for movie_id, delta in sorted(deltas.items())
+    ]
+    stmt = insert(MovieRatingStats).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MovieRatingStats.movie_id],
+        set_={
+            **{column: getattr(MovieRatingStats, column) + getattr(stmt.excluded, column) for column in counter_columns},
+            "updated_at": stmt.excluded.updated_at,
+            "trend": _log_add(MovieRatingStats.trend, stmt.excluded.trend),
+        },
+    )
+    db.execute(stmt)
+    leaderboard_repository.refresh_scores(db, deltas)
+
+
+def get_rating_histograms(db: Session, movie_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """Score histograms (counts of scores 1 to 10) keyed by movie id, read from the stats rows.
+
+    Movies without ratings get all zeros; ids of missing movies are absent.
+    """
+    counts = [
+        func.coalesce(getattr(MovieRatingStats, MovieRatingStats.score_column(score)), 0) for score in SCORE_RANGE
+    ]
+    stmt = (
+        select(Movie.id, *counts)
+        .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        .where(Movie.id.in_(list(movie_ids)))
+    )
+    return {row[0]: list(row[1:]) for row in db.execute(stmt)}
+
 
 def create_rating(db: Session, movie_id: int, score: int) -> MovieRating:
     db_rating = MovieRating(movie_id=movie_id, score=score)
     db.add(db_rating)
+    db.flush()
+    # Same transaction as the rating row, so readers never see the two disagree
+    _apply_stats(db, [(movie_id, score)])
     db.commit()
     db.refresh(db_rating)
-    return db_rating
\ No newline at end of file
+    return db_rating
+
+
+def get_rating_by_idempotency_key(db: Session, idempotency_key: str) -> Optional[MovieRating]:
+    return db.scalar(select(MovieRating).where(MovieRating.idempotency_key == idempotency_key))
+
+
+def upsert_rating(
+    db: Session, movie_id: int, score: int, user_id: Optional[str] = None, idempotency_key: Optional[str] = None
+) -> Tuple[MovieRating, bool]:
+    """Write a rating at most once per idempotency key and once per user; returns (rating, written).
+
+    A rating already stored under `idempotency_key` is returned unchanged with written=False.
+    With `user_id` the user's earlier vote on the movie is overwritten by an
+    INSERT .. ON CONFLICT DO UPDATE and the stats move by the difference; without it the
+    key alone deduplicates.
+    """
+    if idempotency_key is not None:
+        existing = get_rating_by_idempotency_key(db, idempotency_key)
+        if existing is not None:
+            return existing, False
+    values = {"movie_id": movie_id, "score": score, "user_id": user_id, "idempotency_key": idempotency_key}
+
+    if user_id is None:
+        stmt = (
+            insert(MovieRating).values(values)
+            .on_conflict_do_nothing(constraint="uq_movie_ratings_idempotency_key")
+            .returning(MovieRating.id)
+        )
+        rating_id = db.scalar(stmt)
+        if rating_id is None:
+            # A concurrent request with the same key committed first
+            db.rollback()
+            return get_rating_by_idempotency_key(db, idempotency_key), False
+        _apply_stats(db, [(movie_id, score)])
+    else:
+        for _ in range(UPSERT_ATTEMPTS):
+            previous = db.scalar(
+                select(MovieRating.score)
+                .where(MovieRating.movie_id == movie_id, MovieRating.user_id == user_id)
+                .with_for_update()
+            )
+            stmt = insert(MovieRating).values(values)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_movie_ratings_movie_id_user_id",
+                # The row keeps the key of the request that created it, so replaying that
+                # request still finds it instead of writing its score again
+                set_={"score": stmt.excluded.score},
+                # Compare-and-set against the vote read above: if another request inserted the
+                # user's vote since, nothing is updated and the loop reads it again
+                where=MovieRating.score.is_not_distinct_from(previous),
+            ).returning(MovieRating.id)
+            rating_id = db.scalar(stmt)
+            if rating_id is not None:
+                break
+        else:
+            raise RuntimeError(f"Could not upsert rating (movie_id={movie_id}, user_id={user_id})")
+        if previous is None:
+            _apply_stats(db, [(movie_id, score)])
+        else:
+            _apply_stats(db, [(movie_id, score)], replaced=[(movie_id, previous)])
+    db.commit()
+    return db.get(MovieRating, rating_id), True
+
+
+def create_ratings_bulk(db: Session, ratings: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Insert many (movie_id, score) pairs and their stats in one transaction.
+
+    Ratings for movies deleted since they were accepted are skipped. Returns the pairs written.
+    """
+    movie_ids = {movie_id for movie_id, _ in ratings}
+    existing = set(db.scalars(select(Movie.id).where(Movie.id.in_(movie_ids))))
+    ratings = [(movie_id, score) for movie_id, score in ratings if movie_id in existing]
+    if ratings:
+        db.execute(insert(MovieRating), [{"movie_id": movie_id, "score": score} for movie_id, score in ratings])
+        _apply_stats(db, ratings)
+    db.commit()
+    return ratings
@@ -0,0 +1,21 @@
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+from app.models.director import Director
+from app.models.genre import Genre
+from typing import Iterable, Set, Tuple
+
+def find_existing_references(db: Session, director_ids: Iterable[int], genre_ids: Iterable[int]) -> Tuple[Set[int], Set[int]]:
+    """Return which of the given director and genre ids exist, resolved with a single UNION ALL query."""
+    director_ids, genre_ids = set(director_ids), set(genre_ids)
+    queries = []
+    if director_ids:
+        queries.append(select(literal("director").label("kind"), Director.id).where(Director.id.in_(director_ids)))
+    if genre_ids:
+        queries.append(select(literal("genre").label("kind"), Genre.id).where(Genre.id.in_(genre_ids)))
+    if not queries:
+        return set(), set()
+    stmt = queries[0] if len(queries) == 1 else union_all(*queries)
+    existing_directors, existing_genres = set(), set()
+    for kind, ref_id in db.execute(stmt):
+        (existing_directors if kind == "director" else existing_genres).add(ref_id)
+    return existing_directors, existing_genres
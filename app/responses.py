@@ -0,0 +1,46 @@
+from typing import Any, Mapping, Optional
+from pydantic_core import to_json
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from app.conditional import Validators, content_etag, is_not_modified, not_modified
+
+_ENVELOPE_START = b'{"status":"success","data":'
+
+
+class EnvelopeResponse(Response):
+    """`{"status": "success", "data": ...}` with `data` serialized straight to JSON bytes.
+
+    Returning this from a route skips FastAPI's response_model pass (jsonable_encoder over the
+    whole model tree, then the stdlib json encoder): pydantic-core writes the models to bytes in
+    one call and the envelope is joined around them. Routes still declare a typed
+    response_model (app.schemas.envelope.Envelope) for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        super().__init__(content, status_code, headers, None, background)
+
+    def render(self, content: Any) -> bytes:
+        return _ENVELOPE_START + to_json(content) + b"}"
+
+
+def envelope_with_content_etag(request_headers: Headers, data: Any) -> Response:
+    """EnvelopeResponse with a strong ETag over its body, or a 304 when If-None-Match matches it.
+
+    For responses with no cheap version to derive validators from: the body is still built,
+    but a matching client is sent no bytes.
+    """
+    response = EnvelopeResponse(data)
+    validators = Validators(content_etag(response.body))
+    if is_not_modified(request_headers, validators):
+        return not_modified(validators)
+    response.headers.update(validators.headers())
+    return response
@@ -1,6 +1,19 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 
 class DirectorOut(BaseModel):
     id: int
     name: str
+
+
+class DirectorDetailOut(DirectorOut):
+    birth_year: Optional[int] = None
+    description: Optional[str] = None
+
+
+class DirectorPage(BaseModel):
+    page: int
+    page_size: int
+    total_items: int
+    items: List[DirectorDetailOut]
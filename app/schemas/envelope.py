@@ -0,0 +1,9 @@
+from typing import Generic, Literal, TypeVar
+from pydantic import BaseModel
+
+DataT = TypeVar("DataT")
+
+
+class Envelope(BaseModel, Generic[DataT]):
+    status: Literal["success"] = "success"
+    data: DataT
@@ -1,6 +1,15 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 
 class GenreOut(BaseModel):
     id: int
     name: str
+
+
+class GenreDetailOut(GenreOut):
+    description: Optional[str] = None
+
+
+class GenreList(BaseModel):
+    items: List[GenreDetailOut]
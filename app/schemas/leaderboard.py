@@ -0,0 +1,17 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+from .movie import MovieListOut
+
+
+class LeaderboardItem(BaseModel):
+    rank: int
+    weighted_rating: float
+    ratings_count: int
+    movie: MovieListOut
+
+
+class LeaderboardOut(BaseModel):
+    kind: Literal["top-rated", "trending"]
+    genre: Optional[str] = None
+    release_year: Optional[int] = None
+    items: List[LeaderboardItem]
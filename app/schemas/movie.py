@@ -1,13 +1,14 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from app.config import INT4_MAX, INT4_MIN
 from .director import DirectorOut
 
 
 class MovieCreate(BaseModel):
     title: str
     director_id: int
-    release_year: Optional[int] = None
+    release_year: Optional[int] = Field(None, ge=INT4_MIN, le=INT4_MAX)
     cast: Optional[str] = None
     genres: List[int] = []
 
@@ -15,7 +16,7 @@ class MovieCreate(BaseModel):
 class MovieUpdate(BaseModel):
     title: Optional[str] = None
     director_id: Optional[int] = None
-    release_year: Optional[int] = None
+    release_year: Optional[int] = Field(None, ge=INT4_MIN, le=INT4_MAX)
     cast: Optional[str] = None
     genres: Optional[List[int]] = None
 
@@ -35,8 +36,19 @@ class MovieDetailOut(MovieListOut):
     updated_at: datetime
 
 
+class MovieBatchItem(BaseModel):
+    id: int
+    found: bool
+    movie: Optional[MovieDetailOut] = None
+
+
+class MovieBatchOut(BaseModel):
+    items: List[MovieBatchItem]
+
+
 class PaginatedResponse(BaseModel):
-    page: int
+    page: Optional[int]
     page_size: int
-    total_items: int
+    total_items: Optional[int]
     items: List[MovieListOut]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,15 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class MovieImportResult(BaseModel):
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    movie_ids: List[int] = []
+    errors: List[ImportRowError] = []
@@ -1,11 +1,39 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class RatingCreate(BaseModel):
     score: int
+    # Set to keep one vote per user and movie: rating again replaces the earlier score
+    user_id: Optional[str] = Field(None, min_length=1, max_length=64)
 
 
 class RatingOut(RatingCreate):
     id: int
     movie_id: int
-    
\ No newline at end of file
+
+
+class RatingQueuedOut(RatingCreate):
+    movie_id: int
+    queued: bool = True
+
+
+class RatingSummaryOut(BaseModel):
+    movie_id: int
+    ratings_count: int
+    average_rating: float
+    # None until the movie has a rating
+    median: Optional[float] = None
+    stddev: Optional[float] = None
+    # Number of ratings per score, scores 1 to 10 in order
+    histogram: List[int]
+
+
+class RatingSummaryBatchItem(BaseModel):
+    id: int
+    found: bool
+    summary: Optional[RatingSummaryOut] = None
+
+
+class RatingSummaryBatchOut(BaseModel):
+    items: List[RatingSummaryBatchItem]
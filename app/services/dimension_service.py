@@ -0,0 +1,68 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.cache.dimensions import store as dimension_store
+from app.exceptions.custom_exceptions import NotFoundException
+from app.logging import SAMPLED
+from app.schemas.director import DirectorDetailOut, DirectorPage
+from app.schemas.genre import GenreDetailOut, GenreList
+from app.schemas.movie import PaginatedResponse
+from app.services.movie_service import get_all_movies
+import logging
+
+logger = logging.getLogger("movie_rating")
+
+def list_directors(db: Session, page: int = 1, page_size: int = 10) -> DirectorPage:
+    """One page of directors in id order, served from the dimension snapshot."""
+    logger.info("Fetching director list (page=%s, page_size=%s)", page, page_size, extra=SAMPLED)
+    directors = list(dimension_store.get(db).directors.values())
+    start = (page - 1) * page_size
+    return DirectorPage(
+        page=page, page_size=page_size, total_items=len(directors), items=directors[start:start + page_size]
+    )
+
+def get_director(db: Session, director_id: int) -> DirectorDetailOut:
+    director = dimension_store.get(db, director_ids=[director_id]).directors.get(director_id)
+    if director is None:
+        logger.warning("Director not found (director_id=%s)", director_id)
+        raise NotFoundException("Director not found")
+    return director
+
+def get_director_movies(
+    db: Session,
+    director_id: int,
+    page: int = 1,
+    page_size: int = 10,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> PaginatedResponse:
+    get_director(db, director_id)
+    return get_all_movies(
+        db, page, page_size, sort=sort, cursor=cursor, include_total=include_total, director_id=director_id
+    )
+
+def list_genres(db: Session) -> GenreList:
+    """Every genre in id order, served from the dimension snapshot."""
+    logger.info("Fetching genre list", extra=SAMPLED)
+    return GenreList(items=list(dimension_store.get(db).genres.values()))
+
+def get_genre(db: Session, genre_id: int) -> GenreDetailOut:
+    genre = dimension_store.get(db, genre_ids=[genre_id]).genres.get(genre_id)
+    if genre is None:
+        logger.warning("Genre not found (genre_id=%s)", genre_id)
+        raise NotFoundException("Genre not found")
+    return genre
+
+def get_genre_movies(
+    db: Session,
+    genre_id: int,
+    page: int = 1,
+    page_size: int = 10,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> PaginatedResponse:
+    genre = get_genre(db, genre_id)
+    return get_all_movies(
+        db, page, page_size, genre=[genre.name], sort=sort, cursor=cursor, include_total=include_total
+    )
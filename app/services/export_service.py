@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import logging
+from typing import Iterator
+
+from app.config import EXPORT_BATCH_SIZE
+from app.db.session import read_session
+from app.repositories.movie_repository import iter_movies_for_export
+
+logger = logging.getLogger("movie_rating")
+
+CSV_COLUMNS = [
+    "id", "title", "release_year", "cast", "director_id", "director_name",
+    "genres", "average_rating", "ratings_count", "updated_at",
+]
+
+
+def _as_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "release_year": row.release_year,
+        "cast": row.cast,
+        "director": {"id": row.director_id, "name": row.director_name},
+        "genres": row.genres or [],
+        "average_rating": round(float(row.average_rating), 1),
+        "ratings_count": int(row.ratings_count),
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+def _ndjson_lines(rows) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(_as_dict(row), ensure_ascii=False) + "\n"
+
+
+def _csv_lines(rows) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow([
+            row.id, row.title, row.release_year, row.cast, row.director_id, row.director_name,
+            "|".join(row.genres or []), round(float(row.average_rating), 1), int(row.ratings_count),
+            row.updated_at.isoformat() if row.updated_at else "",
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_movie_export(export_format: str) -> Iterator[bytes]:
+    """Yield the whole catalog as NDJSON or CSV in chunks of EXPORT_BATCH_SIZE rows.
+
+    The generator owns its session, so it stays open for as long as the response streams. The
+    export is read-only and long-running, so it goes to a replica when one is configured.
+    """
+    logger.info("Exporting movie catalog (format=%s)", export_format)
+    exported = 0
+    with read_session() as db:
+        rows = iter_movies_for_export(db, EXPORT_BATCH_SIZE)
+        lines = _csv_lines(rows) if export_format == "csv" else _ndjson_lines(rows)
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= EXPORT_BATCH_SIZE:
+                exported += len(chunk)
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
+        if chunk:
+            exported += len(chunk)
+            yield "".join(chunk).encode("utf-8")
+    logger.info("Movie catalog export finished (format=%s, lines=%s)", export_format, exported)
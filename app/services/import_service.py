@@ -0,0 +1,105 @@
+import json
+import logging
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.cache import movie_cache
+from app.config import IMPORT_CHUNK_SIZE
+from app.repositories.movie_repository import create_movies_bulk
+from app.schemas.movie import MovieCreate
+from app.schemas.movie_import import ImportRowError, MovieImportResult
+from app.services.reference_validation import MovieReferences
+
+logger = logging.getLogger("movie_rating")
+
+
+class RecordError:
+    """Placeholder for an input line that could not be decoded."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def decode_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, decoded object) for every non-blank NDJSON line."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, RecordError(f"Invalid JSON: {e.msg}")
+
+
+def _parse(line: int, record: Any, result: MovieImportResult) -> Any:
+    if isinstance(record, RecordError):
+        result.errors.append(ImportRowError(line=line, error=record.message))
+        return None
+    try:
+        return MovieCreate.model_validate(record)
+    except ValidationError as e:
+        message = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+        result.errors.append(ImportRowError(line=line, error=message))
+        return None
+
+
+def _import_chunk(db: Session, chunk: List[Tuple[int, MovieCreate]], result: MovieImportResult) -> None:
+    # One query for every director and genre referenced by the chunk
+    references = MovieReferences.resolve(
+        db,
+        (movie.director_id for _, movie in chunk),
+        (gid for _, movie in chunk for gid in movie.genres),
+    )
+
+    valid = []
+    for line, movie in chunk:
+        errors = references.errors(movie.director_id, movie.genres)
+        if errors:
+            result.errors.append(ImportRowError(line=line, error="; ".join(errors)))
+            continue
+        valid.append((line, movie))
+
+    try:
+        movie_ids = create_movies_bulk(db, [movie for _, movie in valid])
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Failed to import movie chunk (rows=%s)", len(valid), exc_info=True)
+        reason = str(e.orig) if getattr(e, "orig", None) is not None else type(e).__name__
+        result.errors.extend(ImportRowError(line=line, error=f"Database error: {reason}") for line, _ in valid)
+        return
+    result.imported += len(movie_ids)
+    result.movie_ids.extend(movie_ids)
+
+
+def import_movies(db: Session, records: Iterable[Tuple[int, Any]], chunk_size: int = IMPORT_CHUNK_SIZE) -> MovieImportResult:
+    """Validate and insert movies from (line number, record) pairs, one transaction per chunk.
+
+    Records are MovieCreate-shaped dicts. Rows that fail validation are reported in
+    `errors` and do not stop the import; a database error fails only its own chunk.
+    """
+    result = MovieImportResult()
+    records = iter(records)
+    while True:
+        batch = list(islice(records, chunk_size))
+        if not batch:
+            break
+        result.total_rows += len(batch)
+        chunk = []
+        for line, record in batch:
+            movie = _parse(line, record, result)
+            if movie is not None:
+                chunk.append((line, movie))
+        if chunk:
+            _import_chunk(db, chunk, result)
+    result.errors.sort(key=lambda error: error.line)
+    result.failed = len(result.errors)
+    if result.imported:
+        movie_cache.invalidate_lists()
+    logger.info(
+        "Movie import finished (rows=%s, imported=%s, failed=%s)", result.total_rows, result.imported, result.failed
+    )
+    return result
@@ -0,0 +1,68 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.cache import movie_cache
+from app.cache.dimensions import store as dimension_store
+from app.db.session import reads_replica
+from app.exceptions.custom_exceptions import NotFoundException, ValidationException
+from app.logging import SAMPLED
+from app.models.leaderboard import BOARD_ALL, BOARD_GENRE, BOARD_YEAR
+from app.repositories import leaderboard_repository
+from app.repositories.movie_repository import get_leaderboard as get_leaderboard_rows
+from app.schemas.leaderboard import LeaderboardItem, LeaderboardOut
+from app.services.movie_service import dimensions_for, to_list_item
+import logging
+
+logger = logging.getLogger("movie_rating")
+
+def get_leaderboard(
+    db: Session,
+    kind: str,
+    genre: Optional[str] = None,
+    release_year: Optional[int] = None,
+    limit: int = 20,
+    min_votes: int = 0
+) -> LeaderboardOut:
+    """Top-rated (Bayesian average) or trending movies, overall or within one genre or release year."""
+    logger.info(
+        "Fetching leaderboard (kind=%s, genre=%s, release_year=%s, limit=%s)", kind, genre, release_year, limit,
+        extra=SAMPLED,
+    )
+    if genre is not None and release_year is not None:
+        raise ValidationException("Choose either genre or release_year, not both")
+    cache_params = {"kind": kind, "genre": genre, "release_year": release_year, "limit": limit, "min_votes": min_votes}
+    cached = movie_cache.get_leaderboard(cache_params)
+    if cached is not None:
+        logger.info("Leaderboard served from cache", extra=SAMPLED)
+        return cached
+
+    board, board_key = BOARD_ALL, 0
+    if genre is not None:
+        genre_id = dimension_store.get(db).genre_ids_by_name.get(genre)
+        if genre_id is None:
+            logger.warning("Genre not found (genre=%s)", genre)
+            raise NotFoundException("Genre not found")
+        board, board_key = BOARD_GENRE, genre_id
+    elif release_year is not None:
+        board, board_key = BOARD_YEAR, release_year
+
+    rows = get_leaderboard_rows(db, board, board_key, kind == "trending", limit, min_votes)
+    dims = dimensions_for(db, [row for row, _ in rows])
+    items = [
+        LeaderboardItem(
+            rank=rank,
+            weighted_rating=round(weighted_score, 2),
+            ratings_count=int(row[2]),
+            movie=to_list_item(row, dims)
+        )
+        for rank, (row, weighted_score) in enumerate(rows, start=1)
+    ]
+    leaderboard = LeaderboardOut(kind=kind, genre=genre, release_year=release_year, items=items)
+    movie_cache.set_leaderboard(cache_params, leaderboard, from_replica=reads_replica(db))
+    return leaderboard
+
+def rebuild_leaderboards(db: Session) -> int:
+    """Recompute every leaderboard entry; returns how many there are."""
+    count = leaderboard_repository.rebuild(db)
+    movie_cache.invalidate_lists()
+    logger.info("Rebuilt leaderboards (entries=%s)", count)
+    return count
@@ -1,94 +1,286 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from sqlalchemy.orm import Session
-from app.repositories.movie_repository import get_movies, get_movie_by_id, create_movie, update_movie, delete_movie
-from app.repositories.director_repository import get_director_by_id
-from app.repositories.genre_repository import get_genre_by_id
-from app.schemas.movie import MovieCreate, MovieUpdate, MovieListOut, MovieDetailOut, PaginatedResponse
-from app.schemas.director import DirectorOut
+from app.repositories.movie_repository import get_movies, get_movie_by_id, get_movies_by_ids, get_movie_version, create_movie, update_movie, delete_movie
+from app.schemas.movie import MovieCreate, MovieUpdate, MovieListOut, MovieDetailOut, PaginatedResponse, MovieBatchItem, MovieBatchOut
 from app.exceptions.custom_exceptions import NotFoundException, ValidationException
 from typing import Optional
 from app.models.movie import Movie  # Added import
+from app.cache import movie_cache
+from app.config import INT4_MAX
+from app.db.session import reads_replica
+from app.cache.dimensions import DimensionSnapshot, store as dimension_store
+from app.conditional import Validators, is_conditional, is_not_modified, version_etag
+from app.services.reference_validation import validate_movie_references
+from app.logging import SAMPLED
+from starlette.datastructures import Headers
+from decimal import Decimal, InvalidOperation
+import base64
+import json
+import math
 import logging
 
+logger = logging.getLogger("movie_rating")
+
+def _encode_cursor(sort: str, key: tuple) -> str:
+    value, movie_id = key
+    if value is not None and not isinstance(value, str):
+        value = str(value)  # Decimal averages keep their exact value as a string
+    payload = json.dumps({"s": sort, "k": [value, movie_id]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _cursor_value(sort: str, value):
+    """The cursor's sort value as the type `sort` orders by; ValueError when it is not one."""
+    if sort == "title" and isinstance(value, str):
+        return value
+    if sort == "average_rating" and isinstance(value, str):
+        value = Decimal(value)
+        if value.is_finite():
+            return value
+    if sort == "relevance" and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        value = float(value)
+        if math.isfinite(value):
+            return value
+    if sort == "id" and value is None:
+        return None
+    raise ValueError(value)
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, movie_id = payload["k"]
+        # bool is an int subclass; ids past the int4 range would fail in Postgres instead
+        if payload["s"] != sort or type(movie_id) is not int or not 0 <= movie_id <= INT4_MAX:
+            raise ValueError(cursor)
+        value = _cursor_value(sort, value)
+    except (ValueError, KeyError, TypeError, InvalidOperation):
+        raise ValidationException("Invalid cursor")
+    return value, movie_id
+
+def dimensions_for(db: Session, rows) -> DimensionSnapshot:
+    """The director/genre snapshot, refreshed first if it lacks anything the movie rows reference."""
+    return dimension_store.get(
+        db,
+        director_ids={row[0].director_id for row in rows},
+        genre_ids={genre_id for row in rows for genre_id in row[3]},
+    )
+
+def to_list_item(row, dims: DimensionSnapshot) -> MovieListOut:
+    movie, avg_rating, _, genre_ids = row  # Ignore count for list
+    return MovieListOut(
+        id=movie.id,
+        title=movie.title,
+        release_year=movie.release_year,
+        director=dims.director_refs[movie.director_id],
+        genres=dims.genre_names(genre_ids),
+        average_rating=round(float(avg_rating), 1)
+    )
+
+def _resolve_genres(db: Session, names: List[str], match: str) -> List[int]:
+    """Genre ids for a genre filter, looked up in the dimension snapshot.
+
+    Unknown names can never match: they are dropped for match="any", and make the whole
+    filter empty (matching nothing) for match="all".
+    """
+    ids_by_name = dimension_store.get(db).genre_ids_by_name
+    genre_ids = [ids_by_name[name] for name in names if name in ids_by_name]
+    if match == "all" and len(genre_ids) < len(names):
+        return []
+    return genre_ids
+
 def get_all_movies(
     db: Session,
     page: int = 1,
     page_size: int = 10,
     title: Optional[str] = None,
     release_year: Optional[int] = None,
-    genre: Optional[str] = None
+    genre: Optional[List[str]] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    q: Optional[str] = None,
+    director_id: Optional[int] = None,
+    genre_match: str = "any"
 ) -> PaginatedResponse:
-    logger = logging.getLogger("movie_rating")
-    logger.info(f"Fetching movie list (route=/api/v1/movies, page={page}, page_size={page_size}, title={title}, release_year={release_year}, genre={genre})")
-    logger.debug(f"Query parameters: page={page}, page_size={page_size}, filters=(title={title}, release_year={release_year}, genre={genre})")
+    logger.info(
+        "Fetching movie list (route=/api/v1/movies, page=%s, page_size=%s, title=%s, release_year=%s, genre=%s)",
+        page, page_size, title, release_year, genre, extra=SAMPLED,
+    )
+    logger.debug(
+        "Query parameters: page=%s, page_size=%s, sort=%s, cursor=%s, filters=(q=%s, title=%s, release_year=%s, genre=%s)",
+        page, page_size, sort, cursor, q, title, release_year, genre,
+    )
+    q = q.strip() if q else None
+    # Searches are ranked by relevance unless another order is asked for
+    sort = sort or ("relevance" if q else "id")
+    if sort == "relevance" and not q:
+        raise ValidationException("sort=relevance requires a search query q")
+    after = _decode_cursor(cursor, sort) if cursor else None
+    # Order and repeats do not change the result; normalize so they share a cache entry
+    genre = sorted(set(genre)) if genre else None
+    cache_params = {
+        "page": page if after is None else None, "page_size": page_size, "title": title,
+        "release_year": release_year, "genre": genre, "sort": sort, "cursor": cursor,
+        "include_total": include_total, "q": q, "director_id": director_id,
+        "genre_match": genre_match if genre else None,
+    }
+    cached = movie_cache.get_list(cache_params)
+    if cached is not None:
+        logger.info("Movie list served from cache", extra=SAMPLED)
+        return cached
     try:
-        total, movie_data = get_movies(db, page, page_size, title, release_year, genre)
-        logger.debug(f"Total movies: {total}, data length: {len(movie_data)}")
-        items = []
-        for movie, avg_rating, _ in movie_data:  # Ignore count for list
-            items.append(MovieListOut(
-                id=movie.id,
-                title=movie.title,
-                release_year=movie.release_year,
-                director=DirectorOut(id=movie.director.id, name=movie.director.name),
-                genres=[g.name for g in movie.genres],
-                average_rating=round(float(avg_rating), 1)
-            ))
-        logger.info("Movie list fetched successfully")
-        return PaginatedResponse(page=page, page_size=page_size, total_items=total, items=items)
+        genre_ids = _resolve_genres(db, genre, genre_match) if genre else None
+        total, movie_data, next_key = get_movies(
+            db, page, page_size, title, release_year, genre_ids,
+            sort=sort, after=after, include_total=include_total, q=q, director_id=director_id,
+            genre_match=genre_match
+        )
+        logger.debug("Total movies: %s, data length: %s", total, len(movie_data))
+        dims = dimensions_for(db, movie_data)
+        items = [to_list_item(row, dims) for row in movie_data]
+        logger.info("Movie list fetched successfully", extra=SAMPLED)
+        response = PaginatedResponse(
+            page=page if after is None else None,
+            page_size=page_size,
+            total_items=total,
+            items=items,
+            next_cursor=_encode_cursor(sort, next_key) if next_key else None
+        )
+        movie_cache.set_list(cache_params, response, from_replica=reads_replica(db))
+        return response
     except Exception as e:
         logger.error("Failed to fetch movie list", exc_info=True)
         raise
 
-def get_movie_detail(db: Session, movie_id: int) -> MovieDetailOut:
-    logger = logging.getLogger("movie_rating")
-    logger.info(f"Fetching movie detail (movie_id={movie_id}, route=/api/v1/movies/{movie_id})")
-    logger.debug(f"Querying movie by id: {movie_id}")
+def _to_detail(row, dims: DimensionSnapshot) -> MovieDetailOut:
+    movie, avg_rating, ratings_count, genre_ids = row
+    return MovieDetailOut(
+        id=movie.id,
+        title=movie.title,
+        release_year=movie.release_year,
+        director=dims.director_refs[movie.director_id],
+        genres=dims.genre_names(genre_ids),
+        average_rating=round(float(avg_rating), 1),
+        cast=movie.cast,
+        ratings_count=int(ratings_count),
+        updated_at=movie.updated_at
+    )
+
+def _detail_validators(
+    movie_id: int, updated_at, ratings_updated_at, ratings_count: int, dims: DimensionSnapshot
+) -> Validators:
+    # The detail embeds director and genre names, so the snapshot version is part of its ETag
+    last_modified = max(filter(None, (updated_at, ratings_updated_at)), default=None)
+    return Validators(
+        version_etag(movie_id, updated_at, ratings_updated_at, ratings_count, *dims.version), last_modified
+    )
+
+def get_movie_detail_with_validators(db: Session, movie_id: int) -> Tuple[Validators, MovieDetailOut]:
+    """The detail and its validators, both from the cache or both from one aggregate query."""
+    logger.info("Fetching movie detail (movie_id=%s, route=/api/v1/movies/%s)", movie_id, movie_id, extra=SAMPLED)
+    cached = movie_cache.get_detail(movie_id)
+    validators = movie_cache.get_detail_validators(movie_id) if cached is not None else None
+    if validators is not None:
+        logger.info("Movie detail served from cache", extra=SAMPLED)
+        return validators, cached
+    logger.debug("Querying movie by id: %s", movie_id)
     try:
         result = get_movie_by_id(db, movie_id)
         if not result:
-            logger.warning(f"Movie not found (movie_id={movie_id})")
+            logger.warning("Movie not found (movie_id=%s)", movie_id)
             raise NotFoundException("Movie not found")
-        movie, avg_rating, ratings_count = result
-        logger.debug(f"Fetched movie: title={movie.title}, ratings_count={ratings_count}")
-        logger.info("Movie detail fetched successfully")
-        return MovieDetailOut(
-            id=movie.id,
-            title=movie.title,
-            release_year=movie.release_year,
-            director=DirectorOut(id=movie.director.id, name=movie.director.name),
-            genres=[g.name for g in movie.genres],
-            average_rating=round(float(avg_rating), 1),
-            cast=movie.cast,
-            ratings_count=int(ratings_count),
-            updated_at=movie.updated_at
-        )
+        row, ratings_updated_at = result
+        logger.debug("Fetched movie: title=%s, ratings_count=%s", row[0].title, row[2])
+        logger.info("Movie detail fetched successfully", extra=SAMPLED)
+        dims = dimensions_for(db, [row])
+        detail = _to_detail(row, dims)
+        validators = _detail_validators(movie_id, row[0].updated_at, ratings_updated_at, row[2], dims)
+        movie_cache.set_detail(movie_id, detail, from_replica=reads_replica(db))
+        movie_cache.set_detail_validators(movie_id, validators, from_replica=reads_replica(db))
+        return validators, detail
+    except NotFoundException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to fetch movie detail (movie_id={movie_id})", exc_info=True)
+        logger.error("Failed to fetch movie detail (movie_id=%s)", movie_id, exc_info=True)
         raise
 
+def get_movie_detail(db: Session, movie_id: int) -> MovieDetailOut:
+    return get_movie_detail_with_validators(db, movie_id)[1]
+
+def get_movies_batch(db: Session, movie_ids: List[int]) -> MovieBatchOut:
+    """Details for many movies in request order, with a not-found marker for unknown ids.
+
+    Cached details are reused; the rest are loaded together in one query.
+    """
+    logger.info("Fetching movie batch (count=%s, route=/api/v1/movies/batch)", len(movie_ids), extra=SAMPLED)
+    details: Dict[int, MovieDetailOut] = {}
+    missing = []
+    for movie_id in dict.fromkeys(movie_ids):
+        cached = movie_cache.get_detail(movie_id)
+        if cached is not None:
+            details[movie_id] = cached
+        else:
+            missing.append(movie_id)
+    if missing:
+        logger.debug("Querying %s uncached movies", len(missing))
+        rows = get_movies_by_ids(db, missing)
+        dims = dimensions_for(db, rows.values())
+        for movie_id, row in rows.items():
+            detail = details[movie_id] = _to_detail(row, dims)
+            movie_cache.set_detail(movie_id, detail, from_replica=reads_replica(db))
+    logger.info("Movie batch fetched (found=%s, requested=%s)", len(details), len(movie_ids), extra=SAMPLED)
+    return MovieBatchOut(items=[
+        MovieBatchItem(id=movie_id, found=movie_id in details, movie=details.get(movie_id))
+        for movie_id in movie_ids
+    ])
+
+def get_movie_validators(db: Session, movie_id: int) -> Validators:
+    """ETag and Last-Modified for a movie's detail, from the cache or a primary-key lookup."""
+    validators = movie_cache.get_detail_validators(movie_id)
+    if validators is not None:
+        return validators
+    version = get_movie_version(db, movie_id)
+    if version is None:
+        logger.warning("Movie not found (movie_id=%s)", movie_id)
+        raise NotFoundException("Movie not found")
+    updated_at, ratings_updated_at, ratings_count = version
+    validators = _detail_validators(movie_id, updated_at, ratings_updated_at, ratings_count, dimension_store.get(db))
+    movie_cache.set_detail_validators(movie_id, validators, from_replica=reads_replica(db))
+    return validators
+
+def get_movie_detail_if_modified(
+    db: Session, movie_id: int, headers: Headers
+) -> Tuple[Validators, Optional[MovieDetailOut]]:
+    """Validators plus the detail, or None for the detail when the client's copy is current.
+
+    A conditional request is checked on the validators alone, so a 304 never loads the
+    aggregates; a plain request takes its validators from the detail query instead.
+    """
+    if is_conditional(headers):
+        validators = get_movie_validators(db, movie_id)
+        if is_not_modified(headers, validators):
+            logger.debug("Movie detail not modified (movie_id=%s)", movie_id)
+            return validators, None
+    return get_movie_detail_with_validators(db, movie_id)
+
 def create_new_movie(db: Session, movie: MovieCreate) -> MovieDetailOut:
-    if not get_director_by_id(db, movie.director_id):
-        raise ValidationException("Invalid director_id")
-    for gid in movie.genres:
-        if not get_genre_by_id(db, gid):
-            raise ValidationException(f"Invalid genre_id: {gid}")
+    validate_movie_references(db, movie.director_id, movie.genres)
     db_movie = create_movie(db, movie)  # Capture the returned Movie object
+    movie_cache.invalidate_movie(db_movie.id)
+    movie_cache.invalidate_lists()
     return get_movie_detail(db, db_movie.id)  # Use the ID from db_movie
 
 def update_existing_movie(db: Session, movie_id: int, movie_update: MovieUpdate) -> MovieDetailOut:
-    if movie_update.director_id is not None:
-        if not get_director_by_id(db, movie_update.director_id):
-            raise ValidationException("Invalid director_id")
-    if movie_update.genres is not None:
-        for gid in movie_update.genres:
-            if not get_genre_by_id(db, gid):
-                raise ValidationException(f"Invalid genre_id: {gid}")
+    validate_movie_references(db, movie_update.director_id, movie_update.genres)
     updated = update_movie(db, movie_id, movie_update)
     if not updated:
         raise NotFoundException("Movie not found")
+    movie_cache.invalidate_movie(movie_id)
+    # Every editable field is shown, filtered or searched on (cast feeds the q= search vector)
+    movie_cache.invalidate_lists()
     return get_movie_detail(db, movie_id)
 
 def delete_existing_movie(db: Session, movie_id: int):
     if not delete_movie(db, movie_id):
         raise NotFoundException("Movie not found")
+    movie_cache.invalidate_movie(movie_id)
+    movie_cache.invalidate_lists()
@@ -0,0 +1,143 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.cache import movie_cache
+from app.config import (
+    RATING_BATCH_SIZE, RATING_BUFFER_MAX, RATING_ENQUEUE_TIMEOUT, RATING_FLUSH_INTERVAL, RATING_FLUSH_RETRIES,
+    RATING_RETRY_BACKOFF,
+)
+from app.db.session import SessionLocal
+from app.exceptions.custom_exceptions import ServiceUnavailableException
+from app.repositories.rating_repository import create_ratings_bulk
+
+logger = logging.getLogger("movie_rating")
+
+
+class RatingIngestBuffer:
+    """Bounded in-process queue of accepted ratings, written in batches by a background thread.
+
+    A batch is flushed once it reaches `batch_size` ratings or `flush_interval` seconds after its
+    first rating arrived. When the queue is full, `submit` waits up to `enqueue_timeout` seconds
+    and then rejects the rating so callers back off instead of growing memory. A batch whose write
+    fails is retried `retries` times with doubling backoff; only then are its ratings lost.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        enqueue_timeout: float,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._queue: "queue.Queue[Tuple[int, int]]" = queue.Queue(maxsize=max_pending)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counters = {"accepted": 0, "rejected": 0, "written": 0, "skipped": 0, "failed": 0, "retries": 0, "batches": 0}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="rating-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop accepting work and flush everything still queued."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, movie_id: int, score: int) -> None:
+        if self._thread is None or self._stopping.is_set():
+            raise ServiceUnavailableException("Rating ingestion is not running")
+        try:
+            self._queue.put((movie_id, score), timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._count("rejected")
+            raise ServiceUnavailableException("Too many pending ratings, retry later")
+        self._count("accepted")
+
+    def _collect(self) -> List[Tuple[int, int]]:
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if self._stopping.is_set():
+                timeout = 0
+            elif deadline is None:
+                timeout = self.flush_interval
+            else:
+                timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                if batch or self._stopping.is_set():
+                    break
+                continue
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[int, int]]) -> None:
+        # The ratings were already answered with 202, so a failed write is retried before giving up
+        for attempt in range(self.retries + 1):
+            try:
+                with SessionLocal() as db:
+                    written = create_ratings_bulk(db, batch)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    self._count("failed", len(batch))
+                    logger.error(
+                        "Failed to write rating batch, ratings lost (size=%s, attempts=%s)",
+                        len(batch), attempt + 1, exc_info=True,
+                    )
+                    return
+                delay = self.retry_backoff * 2 ** attempt
+                self._count("retries")
+                logger.warning(
+                    "Failed to write rating batch, retrying in %.1fs (size=%s, attempt=%s)",
+                    delay, len(batch), attempt + 1, exc_info=True,
+                )
+                time.sleep(delay)
+        self._count("batches")
+        self._count("written", len(written))
+        self._count("skipped", len(batch) - len(written))
+        for movie_id in {movie_id for movie_id, _ in written}:
+            movie_cache.invalidate_movie(movie_id)
+        if written:
+            movie_cache.invalidate_ratings()
+        logger.debug("Flushed rating batch (size=%s, written=%s)", len(batch), len(written))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"running": self._thread is not None, "pending": self._queue.qsize(), **counters}
+
+
+buffer = RatingIngestBuffer(
+    RATING_BATCH_SIZE, RATING_FLUSH_INTERVAL, RATING_BUFFER_MAX, RATING_ENQUEUE_TIMEOUT,
+    RATING_FLUSH_RETRIES, RATING_RETRY_BACKOFF,
+)
@@ -1,28 +1,140 @@
 from sqlalchemy.orm import Session
-from app.repositories.rating_repository import create_rating
-from app.repositories.movie_repository import get_movie_by_id
-from app.schemas.rating import RatingCreate, RatingOut
-from app.exceptions.custom_exceptions import NotFoundException, ValidationException
+from typing import Dict, List, Optional
+from app.repositories.rating_repository import create_rating, get_rating_histograms, upsert_rating
+from app.repositories.movie_repository import movie_exists
+from app.models.rating_stats import SCORE_RANGE
+from app.schemas.rating import (
+    RatingCreate, RatingOut, RatingQueuedOut, RatingSummaryOut, RatingSummaryBatchItem, RatingSummaryBatchOut
+)
+from app.exceptions.custom_exceptions import ConflictException, NotFoundException, ValidationException
+from app.cache import movie_cache
+from app.db.session import reads_replica
+from app.services import rating_ingest
+from app.logging import SAMPLED
 import logging
+import math
 
-def add_rating(db: Session, movie_id: int, rating: RatingCreate) -> RatingOut:
-    logger = logging.getLogger("movie_rating")
-    logger.info(f"Rating movie (movie_id={movie_id}, rating={rating.score}, route=/api/v1/movies/{movie_id}/ratings)")
-    logger.debug(f"Received rating request for movie_id={movie_id}, score={rating.score}")
-    logger.debug(f"Checking score validity: {rating.score}")
+logger = logging.getLogger("movie_rating")
+
+def validate_rating(db: Session, movie_id: int, rating: RatingCreate):
+    logger.debug("Received rating request for movie_id=%s, score=%s", movie_id, rating.score)
+    logger.debug("Checking score validity: %s", rating.score)
     if rating.score < 1 or rating.score > 10:
-        logger.warning(f"Invalid rating value (movie_id={movie_id}, rating={rating.score}, route=/api/v1/movies/{movie_id}/ratings)")
+        logger.warning(
+            "Invalid rating value (movie_id=%s, rating=%s, route=/api/v1/movies/%s/ratings)",
+            movie_id, rating.score, movie_id,
+        )
         raise ValidationException("Score must be between 1 and 10")
     logger.debug("Checking movie existence")
-    if get_movie_by_id(db, movie_id) is None:
-        logger.warning(f"Movie not found (movie_id={movie_id})")
+    if not movie_exists(db, movie_id):
+        logger.warning("Movie not found (movie_id=%s)", movie_id)
         raise NotFoundException("Movie not found")
+
+def add_rating(db: Session, movie_id: int, rating: RatingCreate, idempotency_key: Optional[str] = None) -> RatingOut:
+    """Write a rating now. With a user_id or an idempotency key it goes through the deduplicating upsert.
+
+    A retry carrying an already used key gets the stored rating back without writing again.
+    """
+    logger.info(
+        "Rating movie (movie_id=%s, rating=%s, route=/api/v1/movies/%s/ratings)",
+        movie_id, rating.score, movie_id, extra=SAMPLED,
+    )
+    validate_rating(db, movie_id, rating)
     try:
         logger.debug("Attempting to create rating")
-        db_rating = create_rating(db, movie_id, rating.score)
-        logger.debug(f"Created rating id={db_rating.id}")
-        logger.info(f"Rating saved successfully (movie_id={movie_id}, rating={rating.score})")
-        return RatingOut(id=db_rating.id, movie_id=db_rating.movie_id, score=db_rating.score)
+        if rating.user_id is None and idempotency_key is None:
+            db_rating, written = create_rating(db, movie_id, rating.score), True
+        else:
+            db_rating, written = upsert_rating(db, movie_id, rating.score, rating.user_id, idempotency_key)
+    except Exception:
+        logger.error("Failed to save rating (movie_id=%s, rating=%s)", movie_id, rating.score, exc_info=True)
+        raise
+    if not written:
+        if (db_rating.movie_id, db_rating.score, db_rating.user_id) != (movie_id, rating.score, rating.user_id):
+            logger.warning("Idempotency key reused for a different rating (movie_id=%s)", movie_id)
+            raise ConflictException("Idempotency-Key was already used for a different rating")
+        logger.info("Rating replayed for a repeated idempotency key (rating_id=%s)", db_rating.id, extra=SAMPLED)
+    else:
+        movie_cache.invalidate_movie(movie_id)
+        movie_cache.invalidate_ratings()
+        logger.debug("Created rating id=%s", db_rating.id)
+        logger.info("Rating saved successfully (movie_id=%s, rating=%s)", movie_id, rating.score, extra=SAMPLED)
+    return RatingOut(id=db_rating.id, movie_id=db_rating.movie_id, score=db_rating.score, user_id=db_rating.user_id)
+
+def enqueue_rating(movie_id: int, rating: RatingCreate) -> RatingQueuedOut:
+    """Hand a rating already checked by validate_rating to the write-behind buffer.
+
+    Waits up to RATING_ENQUEUE_TIMEOUT for room in the queue, so async callers must run it in
+    the threadpool rather than on the event loop (e.g. not inside AsyncSession.run_sync).
+    """
+    logger.info(
+        "Queueing rating (movie_id=%s, rating=%s, route=/api/v1/movies/%s/ratings)",
+        movie_id, rating.score, movie_id, extra=SAMPLED,
+    )
+    try:
+        rating_ingest.buffer.submit(movie_id, rating.score)
     except Exception:
-        logger.error(f"Failed to save rating (movie_id={movie_id}, rating={rating.score})", exc_info=True)
-        raise
\ No newline at end of file
+        logger.warning("Rating rejected by ingest buffer (movie_id=%s, rating=%s)", movie_id, rating.score)
+        raise
+    return RatingQueuedOut(movie_id=movie_id, score=rating.score)
+
+def _median(histogram: List[int], count: int) -> float:
+    # Mean of the two middle scores (the same score when count is odd)
+    lower, upper = (count - 1) // 2, count // 2
+    seen, low_score = 0, None
+    for score, score_count in zip(SCORE_RANGE, histogram):
+        seen += score_count
+        if low_score is None and seen > lower:
+            low_score = score
+        if seen > upper:
+            return (low_score + score) / 2
+    raise ValueError("histogram does not add up to count")
+
+def summarize_histogram(movie_id: int, histogram: List[int]) -> RatingSummaryOut:
+    """Count, mean, median and population standard deviation from the 1-10 score counts alone."""
+    count = sum(histogram)
+    if not count:
+        return RatingSummaryOut(movie_id=movie_id, ratings_count=0, average_rating=0.0, histogram=histogram)
+    mean = sum(score * score_count for score, score_count in zip(SCORE_RANGE, histogram)) / count
+    variance = sum(score_count * (score - mean) ** 2 for score, score_count in zip(SCORE_RANGE, histogram)) / count
+    return RatingSummaryOut(
+        movie_id=movie_id,
+        ratings_count=count,
+        average_rating=round(mean, 1),
+        median=_median(histogram, count),
+        stddev=round(math.sqrt(variance), 2),
+        histogram=histogram,
+    )
+
+def _load_summaries(db: Session, movie_ids: List[int]) -> Dict[int, RatingSummaryOut]:
+    """Summaries keyed by movie id from the cache, with the rest read in one query; missing movies are absent."""
+    summaries: Dict[int, RatingSummaryOut] = {}
+    missing = []
+    for movie_id in dict.fromkeys(movie_ids):
+        cached = movie_cache.get_rating_summary(movie_id)
+        if cached is not None:
+            summaries[movie_id] = cached
+        else:
+            missing.append(movie_id)
+    if missing:
+        for movie_id, histogram in get_rating_histograms(db, missing).items():
+            summary = summaries[movie_id] = summarize_histogram(movie_id, histogram)
+            movie_cache.set_rating_summary(movie_id, summary, from_replica=reads_replica(db))
+    return summaries
+
+def get_rating_summary(db: Session, movie_id: int) -> RatingSummaryOut:
+    logger.info("Fetching rating summary (movie_id=%s, route=/api/v1/movies/%s/ratings/summary)", movie_id, movie_id, extra=SAMPLED)
+    summary = _load_summaries(db, [movie_id]).get(movie_id)
+    if summary is None:
+        logger.warning("Movie not found (movie_id=%s)", movie_id)
+        raise NotFoundException("Movie not found")
+    return summary
+
+def get_rating_summaries(db: Session, movie_ids: List[int]) -> RatingSummaryBatchOut:
+    """Rating summaries for many movies in request order, with a not-found marker for unknown ids."""
+    logger.info("Fetching rating summary batch (count=%s, route=/api/v1/movies/ratings/summary)", len(movie_ids), extra=SAMPLED)
+    summaries = _load_summaries(db, movie_ids)
+    return RatingSummaryBatchOut(items=[
+        RatingSummaryBatchItem(id=movie_id, found=movie_id in summaries, summary=summaries.get(movie_id))
+        for movie_id in movie_ids
+    ])
@@ -0,0 +1,43 @@
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import INT4_MAX
+from app.exceptions.custom_exceptions import ValidationException
+from app.repositories.reference_repository import find_existing_references
+
+
+class MovieReferences:
+    """The existing directors and genres among a batch of candidate ids, looked up once."""
+
+    def __init__(self, director_ids: Set[int], genre_ids: Set[int]):
+        self.director_ids = director_ids
+        self.genre_ids = genre_ids
+
+    @classmethod
+    def resolve(cls, db: Session, director_ids: Iterable[int], genre_ids: Iterable[int]) -> "MovieReferences":
+        # Ids outside the int4 key range cannot exist, and asyncpg could not send them anyway
+        director_ids = [director_id for director_id in director_ids if 1 <= director_id <= INT4_MAX]
+        genre_ids = [genre_id for genre_id in genre_ids if 1 <= genre_id <= INT4_MAX]
+        return cls(*find_existing_references(db, director_ids, genre_ids))
+
+    def errors(self, director_id: Optional[int], genre_ids: Optional[Iterable[int]]) -> List[str]:
+        """Describe every unknown id referenced by one movie; empty when all of them exist."""
+        errors = []
+        if director_id is not None and director_id not in self.director_ids:
+            errors.append(f"Invalid director_id: {director_id}")
+        invalid_genres = list(dict.fromkeys(gid for gid in genre_ids or [] if gid not in self.genre_ids))
+        if invalid_genres:
+            errors.append(f"Invalid genre_id: {', '.join(map(str, invalid_genres))}")
+        return errors
+
+
+def validate_movie_references(db: Session, director_id: Optional[int], genre_ids: Optional[Iterable[int]]) -> None:
+    """Raise a ValidationException naming all invalid director/genre ids of a create or update."""
+    genre_ids = list(genre_ids or [])
+    if director_id is None and not genre_ids:
+        return
+    references = MovieReferences.resolve(db, [director_id] if director_id is not None else [], genre_ids)
+    errors = references.errors(director_id, genre_ids)
+    if errors:
+        raise ValidationException("; ".join(errors))
@@ -0,0 +1,8 @@
+"""Load and latency benchmarks for the movie API.
+
+    poetry run python -m benchmarks seed --movies 100000 --ratings 2000000
+    poetry run python -m benchmarks run --mix mixed --duration 30 --concurrency 16
+    poetry run python -m benchmarks run --mode uvicorn --workers 4 --trace traffic.jsonl
+    poetry run python -m benchmarks compare benchmarks/results/base.json benchmarks/results/new.json
+    poetry run python -m benchmarks serialize --page-size 100
+"""
@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+from benchmarks.seed import ROOT, CatalogSize, build_database, database_url
+
+load_dotenv(ROOT / ".env")
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# Settings that change performance; recorded with every run so results stay comparable
+SETTINGS = [
+    "DB_ASYNC", "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "CACHE_BACKEND", "CACHE_TTL_SECONDS",
+    "RATING_INGEST_MODE", "RATING_BATCH_SIZE", "MAX_PAGE_SIZE",
+]
+
+
+def _base_url() -> str:
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        sys.exit("DATABASE_URL is not set")
+    return url
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def seed(args):
+    size = CatalogSize(
+        movies=args.movies, directors=args.directors, genres=args.genres, ratings=args.ratings,
+        rating_skew=args.skew, random_seed=args.random_seed,
+    )
+    print(f"Building {args.database}: {size.as_dict()}")
+    build_database(_base_url(), args.database, size, args.schema)
+    print("Done.")
+
+
+def run(args):
+    from benchmarks.report import summarize
+    from benchmarks.runner import run_in_process, run_uvicorn
+    from benchmarks.workload import Catalog, load_trace, synthetic
+
+    url = database_url(_base_url(), args.database)
+    # The app (and uvicorn's workers) read DATABASE_URL when app.db.session is imported
+    os.environ["DATABASE_URL"] = url
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        catalog_counts = dict(conn.execute(text(
+            "SELECT (SELECT count(*) FROM movies) AS movies, (SELECT count(*) FROM movie_ratings) AS ratings"
+        )).one()._mapping)
+    if args.warmup is None:
+        args.warmup = 0 if args.trace else 200
+    if args.trace:
+        requests = iter(load_trace(args.trace))
+        workload = {"trace": str(args.trace)}
+    else:
+        requests = synthetic(args.mix, Catalog.load(engine), args.seed)
+        workload = {"mix": args.mix, "seed": args.seed}
+    engine.dispose()
+
+    runner = run_uvicorn if args.mode == "uvicorn" else run_in_process
+    samples, wall_time = runner(requests, args)
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "uvicorn" else None,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "max_requests": args.requests,
+            "workload": workload,
+            "catalog": catalog_counts,
+            "settings": {name: os.getenv(name) for name in SETTINGS if os.getenv(name) is not None},
+        },
+        **summarize(samples, wall_time),
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{args.mode}-{args.mix if not args.trace else 'trace'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    print(f"{'endpoint':45} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for endpoint, stats in [("overall", result["overall"]), *result["endpoints"].items()]:
+        latency = stats["latency_ms"]
+        queries = stats["queries_per_request"]
+        print(
+            f"{endpoint:45} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>9.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f} "
+            f"{queries if queries is not None else '-':>8}"
+        )
+    print(f"Saved {output}")
+
+
+def compare(args):
+    from benchmarks.report import compare as compare_results
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    lines, regressions = compare_results(base, new, args.threshold, args.min_requests)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\nRegressions over {args.threshold}%:")
+        print("\n".join(f"  {regression}" for regression in regressions))
+        sys.exit(1)
+
+
+def serialize(args):
+    from benchmarks.serialization import measure
+
+    print(f"{'response':25} {'bytes':>8} {'generic us':>11} {'envelope us':>12} {'speedup':>8}")
+    for name, stats in measure(args.page_size, args.seconds).items():
+        print(
+            f"{name:25} {stats['bytes']:>8} {stats['generic_us']:>11.1f} "
+            f"{stats['envelope_us']:>12.1f} {stats['speedup']:>7.2f}x"
+        )
+
+
+def main():
+    from benchmarks.workload import MIXES
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Movie API load benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="build and seed a benchmark database")
+    seed_parser.add_argument("--database", default="movie_db_bench")
+    seed_parser.add_argument("--schema", type=Path, default=ROOT / "scripts" / "schema.sql", help="base tables DDL")
+    seed_parser.add_argument("--movies", type=int, default=CatalogSize.movies)
+    seed_parser.add_argument("--directors", type=int, default=CatalogSize.directors)
+    seed_parser.add_argument("--genres", type=int, default=CatalogSize.genres)
+    seed_parser.add_argument("--ratings", type=int, default=CatalogSize.ratings)
+    seed_parser.add_argument("--skew", type=float, default=CatalogSize.rating_skew, help="rating popularity skew")
+    seed_parser.add_argument("--random-seed", type=float, default=CatalogSize.random_seed, help="setseed() value, -1..1")
+    seed_parser.set_defaults(handler=seed)
+
+    run_parser = commands.add_parser("run", help="replay a workload and record latency and throughput")
+    run_parser.add_argument("--database", default="movie_db_bench")
+    run_parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    run_parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    run_parser.add_argument("--trace", type=Path, help="replay a recorded JSONL trace instead of a mix")
+    run_parser.add_argument("--seed", type=int, default=0, help="workload random seed")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--duration", type=float, default=30, help="seconds; 0 runs until --requests or the trace ends")
+    run_parser.add_argument("--requests", type=int, help="stop after this many requests")
+    run_parser.add_argument("--warmup", type=int, help="unrecorded requests before measuring (default: 200, 0 for traces)")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run_parser.add_argument("--port", type=int, help="uvicorn port (default: a free one)")
+    run_parser.add_argument("--output", type=Path, help="result JSON path (default: benchmarks/results/)")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    compare_parser.add_argument("--min-requests", type=int, default=30, help="skip gating endpoints with fewer samples")
+    compare_parser.set_defaults(handler=compare)
+
+    serialize_parser = commands.add_parser("serialize", help="time response serialization without a database")
+    serialize_parser.add_argument("--page-size", type=int, default=100)
+    serialize_parser.add_argument("--seconds", type=float, default=2.0, help="time spent on each path")
+    serialize_parser.set_defaults(handler=serialize)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
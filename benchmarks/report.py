@@ -0,0 +1,88 @@
+"""Summaries of benchmark samples and run-to-run comparison."""
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.runner import Sample
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _summarize_group(samples: List[Sample], wall_time: float) -> dict:
+    latencies = sorted(sample.latency for sample in samples)
+    queries = [sample.queries for sample in samples if sample.queries is not None]
+    statuses: Dict[str, int] = defaultdict(int)
+    for sample in samples:
+        statuses[str(sample.status)] += 1
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample.status == 0 or sample.status >= 500),
+        "statuses": dict(sorted(statuses.items())),
+        "rps": round(len(samples) / wall_time, 2) if wall_time else 0.0,
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(1000 * percentile(latencies, 0.50), 3),
+            "p95": round(1000 * percentile(latencies, 0.95), 3),
+            "p99": round(1000 * percentile(latencies, 0.99), 3),
+            "max": round(1000 * latencies[-1], 3) if latencies else 0.0,
+        },
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        "max_queries": max(queries) if queries else None,
+    }
+
+
+def summarize(samples: List[Sample], wall_time: float) -> dict:
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+    return {
+        "wall_time_s": round(wall_time, 3),
+        "overall": _summarize_group(samples, wall_time),
+        "endpoints": {endpoint: _summarize_group(group, wall_time) for endpoint, group in sorted(by_endpoint.items())},
+    }
+
+
+def _change(base: float, new: float) -> Optional[float]:
+    if not base:
+        return None
+    return 100.0 * (new - base) / base
+
+
+def compare(base: dict, new: dict, threshold: float, min_requests: int = 30) -> Tuple[List[str], List[str]]:
+    """Return (report lines, regressions) for endpoints present in both runs.
+
+    A regression is a p95 latency increase or an RPS drop of more than `threshold` percent;
+    endpoints with fewer than `min_requests` samples in either run are shown but not gated.
+    """
+    lines = [f"{'endpoint':45} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18} {'rps':>18}"]
+    regressions = []
+    rows = [("overall", base["overall"], new["overall"])] + [
+        (endpoint, stats, new["endpoints"][endpoint])
+        for endpoint, stats in base["endpoints"].items()
+        if endpoint in new["endpoints"]
+    ]
+    for endpoint, old, current in rows:
+        cells = []
+        for key in ("p50", "p95", "p99"):
+            before, after = old["latency_ms"][key], current["latency_ms"][key]
+            change = _change(before, after)
+            cells.append(f"{before:>7.1f}->{after:<7.1f}" + (f"{change:+.0f}%" if change is not None else ""))
+        change = _change(old["rps"], current["rps"])
+        cells.append(f"{old['rps']:>7.0f}->{current['rps']:<7.0f}" + (f"{change:+.0f}%" if change is not None else ""))
+        lines.append(f"{endpoint:45} " + " ".join(f"{cell:>18}" for cell in cells))
+
+        if min(old["requests"], current["requests"]) < min_requests:
+            continue
+        p95_change = _change(old["latency_ms"]["p95"], current["latency_ms"]["p95"])
+        if p95_change is not None and p95_change > threshold:
+            regressions.append(f"{endpoint}: p95 {p95_change:+.1f}%")
+        rps_change = _change(old["rps"], current["rps"])
+        if rps_change is not None and -rps_change > threshold:
+            regressions.append(f"{endpoint}: rps {rps_change:+.1f}%")
+    return lines, regressions
@@ -0,0 +1,178 @@
+"""Drive a request stream against the app, in-process over ASGI or through a uvicorn server."""
+import asyncio
+import contextvars
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+import httpx
+from sqlalchemy import event
+from starlette.routing import Match
+
+from benchmarks.seed import ROOT
+from benchmarks.workload import Request
+
+# Per-request query counter; the ASGI app runs in the calling task's context, and both the
+# threadpool and AsyncSession.run_sync carry that context into the database calls.
+_query_counter: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("bench_query_counter", default=None)
+
+# Query count reported by the app's Server-Timing header (app.middleware.QueryStatsMiddleware)
+_SERVER_TIMING_QUERIES = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"')
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    latency: float
+    queries: Optional[int]
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def install_query_counter(engines: Iterable) -> None:
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _count_query)
+
+
+def _server_timing_queries(response: httpx.Response) -> Optional[int]:
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+def route_template(app, request: Request) -> str:
+    """Label a request with its route template, e.g. "GET /api/v1/movies/{movie_id}"."""
+    scope = {"type": "http", "path": request.path, "method": request.method}
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{request.method} {route.path}"
+    return f"{request.method} {request.path}"
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    requests: Iterator[Request],
+    label,
+    concurrency: int,
+    duration: Optional[float],
+    max_requests: Optional[int],
+    count_queries: bool,
+) -> List[Sample]:
+    samples: List[Sample] = []
+    deadline = time.perf_counter() + duration if duration else None
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if max_requests is not None and issued >= max_requests:
+                return
+            request = next(requests, None)
+            if request is None:
+                return
+            issued += 1
+            counter = [0] if count_queries else None
+            token = _query_counter.set(counter)
+            started = time.perf_counter()
+            queries = None
+            try:
+                response = await client.request(request.method, request.path, params=request.params, json=request.json)
+                status = response.status_code
+                queries = counter[0] if counter is not None else _server_timing_queries(response)
+            except httpx.HTTPError:
+                status = 0
+            finally:
+                _query_counter.reset(token)
+            samples.append(Sample(label(request), status, time.perf_counter() - started, queries))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def _run_phases(client, requests, label, args, count_queries):
+    if args.warmup:
+        await _drive(client, requests, label, args.concurrency, None, args.warmup, False)
+    started = time.perf_counter()
+    samples = await _drive(client, requests, label, args.concurrency, args.duration, args.requests, count_queries)
+    return samples, time.perf_counter() - started
+
+
+def run_in_process(requests: Iterator[Request], args) -> tuple:
+    """Serve the app over httpx's ASGI transport inside this process, counting queries per request."""
+    from app.db.session import async_engine, engine
+    from app.main import app
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    install_query_counter(engines)
+
+    async def main():
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                return await _run_phases(client, requests, lambda request: route_template(app, request), args, True)
+
+    return asyncio.run(main())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_uvicorn(requests: Iterator[Request], args) -> tuple:
+    """Start uvicorn workers in a subprocess and drive them over HTTP.
+
+    Query counts come from the Server-Timing header, so they are missing when SERVER_TIMING is off.
+    """
+    from app.main import app
+
+    port = args.port or _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, env=os.environ.copy())
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_ready(base_url, server)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+        async def main():
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+                return await _run_phases(client, requests, lambda request: route_template(app, request), args, False)
+
+        return asyncio.run(main())
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/v1/movies/", params={"page_size": 1}, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"uvicorn did not become ready within {timeout}s")
@@ -0,0 +1,142 @@
+"""Scratch databases and a parameterized synthetic catalog for benchmarks and plan checks."""
+import os
+from datetime import datetime
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+ROOT = Path(__file__).resolve().parents[1]
+
+GENRE_NAMES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family", "Fantasy",
+    "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction", "Thriller", "TV Movie", "War",
+    "Western", "Foreign",
+]
+
+
+@dataclass
+class CatalogSize:
+    movies: int = 100_000
+    directors: int = 5_000
+    genres: int = 20
+    ratings: int = 2_000_000
+    # Ratings per movie follow a power law; higher skew concentrates them on fewer movies
+    rating_skew: float = 3.0
+    random_seed: float = 0.42
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def database_url(base_url: str, database: str) -> str:
+    return make_url(base_url).set(database=database).render_as_string(hide_password=False)
+
+
+def create_database(base_url: str, database: str) -> None:
+    admin = create_engine(database_url(base_url, "postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{database}"'))
+        conn.execute(text(f'CREATE DATABASE "{database}"'))
+    admin.dispose()
+
+
+def drop_database(base_url: str, database: str) -> None:
+    admin = create_engine(database_url(base_url, "postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{database}"'))
+    admin.dispose()
+
+
+def load_schema(engine, path: Path) -> None:
+    """Create the base tables (scripts/schema.sql); the migrations build on top of them."""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(path.read_text(encoding="utf-8"))
+
+
+def migrate(url: str) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    # alembic/env.py reads the target from DATABASE_URL
+    os.environ["DATABASE_URL"] = url
+    config = Config(os.getenv("ALEMBIC_CONFIG", str(ROOT / "alembic.ini")))
+    command.upgrade(config, "head")
+
+
+def seed_catalog(engine, size: CatalogSize) -> None:
+    """Fill the catalog server-side with generate_series; setseed makes every run identical."""
+    # Imported here because app modules read DATABASE_URL on import
+    from sqlalchemy.orm import Session
+    from app.repositories.rating_repository import TREND_DECAY, TREND_EPOCH
+    from app.services.leaderboard_service import rebuild_leaderboards
+
+    genre_names = GENRE_NAMES[:size.genres] + [f"Genre {n}" for n in range(len(GENRE_NAMES) + 1, size.genres + 1)]
+    with engine.begin() as conn:
+        conn.execute(text("SELECT setseed(:seed)"), {"seed": size.random_seed})
+        conn.execute(text(
+            "INSERT INTO directors (name, birth_year) "
+            "SELECT 'Director ' || g, 1940 + g % 60 FROM generate_series(1, :n) g ON CONFLICT DO NOTHING"
+        ), {"n": size.directors})
+        conn.execute(
+            text("INSERT INTO genres (name) SELECT unnest(CAST(:names AS text[])) ON CONFLICT DO NOTHING"),
+            {"names": genre_names},
+        )
+        conn.execute(text(
+            "CREATE TEMPORARY TABLE seed_directors ON COMMIT DROP AS "
+            "SELECT row_number() OVER (ORDER BY id) - 1 AS n, id FROM directors"
+        ))
+        conn.execute(text(
+            'INSERT INTO movies (title, director_id, release_year, "cast", created_at, updated_at) '
+            "SELECT 'Movie ' || g || CASE WHEN g % 97 = 0 THEN ' Knight' ELSE '' END, d.id, 1950 + g % 75, "
+            "'Actor ' || g || ', Actor ' || (g + 1), now(), now() "
+            "FROM generate_series(1, :n) g JOIN seed_directors d ON d.n = g % (SELECT count(*) FROM seed_directors)"
+        ), {"n": size.movies})
+        # About three genres per movie
+        conn.execute(text(
+            "INSERT INTO movie_genres (movie_id, genre_id) "
+            "SELECT m.id, g.id FROM movies m JOIN genres g ON (m.id + g.id) % greatest(:genres / 3, 1) = 0 "
+            "ON CONFLICT DO NOTHING"
+        ), {"genres": size.genres})
+        conn.execute(text(
+            "CREATE TEMPORARY TABLE seed_movies ON COMMIT DROP AS "
+            "SELECT row_number() OVER (ORDER BY id) - 1 AS n, id FROM movies"
+        ))
+        conn.execute(text("CREATE INDEX ON seed_movies (n)"))
+        conn.execute(text(
+            "INSERT INTO movie_ratings (movie_id, score) "
+            "SELECT m.id, 1 + floor(random() * 10)::int "
+            "FROM (SELECT floor(power(random(), :skew) * (SELECT count(*) FROM seed_movies))::bigint AS n "
+            "      FROM generate_series(1, :n)) r "
+            "JOIN seed_movies m ON m.n = r.n"
+        ), {"n": size.ratings, "skew": size.rating_skew})
+        score_counts = ", ".join(f"count(*) FILTER (WHERE score = {score})" for score in range(1, 11))
+        score_columns = ", ".join(f"score_{score}_count" for score in range(1, 11))
+        conn.execute(text("DELETE FROM movie_rating_stats"))
+        conn.execute(text(
+            f"INSERT INTO movie_rating_stats (movie_id, ratings_sum, ratings_count, {score_columns}, updated_at) "
+            f"SELECT movie_id, sum(score), count(*), {score_counts}, now() FROM movie_ratings GROUP BY movie_id"
+        ))
+        # As if every seeded rating arrived now, so the trending boards have entries to rank
+        conn.execute(
+            text("UPDATE movie_rating_stats SET trend = :now_weight + ln(ratings_count)"),
+            {"now_weight": TREND_DECAY * (datetime.utcnow() - TREND_EPOCH).total_seconds()},
+        )
+        rebuild_leaderboards(Session(bind=conn))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def build_database(base_url: str, database: str, size: CatalogSize, schema: Path) -> str:
+    """Create `database` from scratch, migrate it to head and seed it; returns its URL."""
+    url = database_url(base_url, database)
+    create_database(base_url, database)
+    engine = create_engine(url)
+    try:
+        load_schema(engine, schema)
+        migrate(url)
+        seed_catalog(engine, size)
+    finally:
+        engine.dispose()
+    return url
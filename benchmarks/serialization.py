@@ -0,0 +1,75 @@
+"""Time response serialization for one list page: FastAPI's generic path vs EnvelopeResponse.
+
+The generic path is what `response_model=dict` routes did: jsonable_encoder over the envelope
+and its model tree, then JSONResponse's stdlib json.dumps. No database is needed.
+"""
+import json
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import EnvelopeResponse
+from app.schemas.director import DirectorOut
+from app.schemas.movie import MovieDetailOut, MovieListOut, PaginatedResponse
+
+
+def sample_page(size: int) -> PaginatedResponse:
+    items = [
+        MovieListOut(
+            id=movie_id,
+            title=f"Movie {movie_id}: The Return of the Benchmark",
+            release_year=1950 + movie_id % 75,
+            director=DirectorOut(id=movie_id % 500, name=f"Director {movie_id % 500}"),
+            genres=["Drama", "Thriller", "Science Fiction"][: 1 + movie_id % 3],
+            average_rating=round(5 + (movie_id * 37 % 500) / 100, 2),
+        )
+        for movie_id in range(1, size + 1)
+    ]
+    return PaginatedResponse(page=1, page_size=size, total_items=100000, items=items, next_cursor="eyJpZCI6IDEwMH0")
+
+
+def sample_detail() -> MovieDetailOut:
+    return MovieDetailOut(
+        **sample_page(1).items[0].model_dump(),
+        cast="Actor One, Actor Two, Actor Three",
+        ratings_count=1234,
+        updated_at=datetime(2024, 5, 1, 12, 30, 15, 250000),
+    )
+
+
+def generic_body(data) -> bytes:
+    return JSONResponse(jsonable_encoder({"status": "success", "data": data})).body
+
+
+def envelope_body(data) -> bytes:
+    return EnvelopeResponse(data).body
+
+
+def _per_call(fn: Callable, data, seconds: float) -> float:
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(20):
+            fn(data)
+        calls += 20
+    return (time.perf_counter() - started) / calls
+
+
+def measure(page_size: int, seconds: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, data in ((f"list page_size={page_size}", sample_page(page_size)), ("detail", sample_detail())):
+        # Both paths must produce the same document
+        assert json.loads(generic_body(data)) == json.loads(envelope_body(data)), name
+        generic = _per_call(generic_body, data, seconds)
+        envelope = _per_call(envelope_body, data, seconds)
+        results[name] = {
+            "generic_us": round(generic * 1e6, 1),
+            "envelope_us": round(envelope * 1e6, 1),
+            "speedup": round(generic / envelope, 2),
+            "bytes": len(envelope_body(data)),
+        }
+    return results
@@ -0,0 +1,149 @@
+"""Request generators: weighted synthetic mixes and recorded-trace replay."""
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+
+API = "/api/v1/movies"
+
+SEARCH_TERMS = ["knight", "movie 12", "actor 7", "dark", "movie 4242", "nigth"]
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+
+
+@dataclass
+class Catalog:
+    """What the generators need to know about the seeded data to build valid requests."""
+    movie_ids: range
+    director_ids: List[int]
+    genre_ids: List[int]
+    genre_names: List[str]
+    # Most traffic goes to a small set of popular movies
+    hot_movie_ids: List[int] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, engine) -> "Catalog":
+        with engine.connect() as conn:
+            low, high = conn.execute(text("SELECT min(id), max(id) FROM movies")).one()
+            director_ids = list(conn.scalars(text("SELECT id FROM directors ORDER BY id")))
+            genres = conn.execute(text("SELECT id, name FROM genres ORDER BY id")).all()
+            hot = list(conn.scalars(text(
+                "SELECT movie_id FROM movie_rating_stats ORDER BY ratings_count DESC, movie_id LIMIT 100"
+            )))
+        return cls(
+            movie_ids=range(low, high + 1),
+            director_ids=director_ids,
+            genre_ids=[genre_id for genre_id, _ in genres],
+            genre_names=[name for _, name in genres],
+            hot_movie_ids=hot,
+        )
+
+    def movie_id(self, rng: random.Random) -> int:
+        if self.hot_movie_ids and rng.random() < 0.5:
+            return rng.choice(self.hot_movie_ids)
+        return rng.choice(self.movie_ids)
+
+
+Generator = Callable[[random.Random, Catalog], Request]
+
+
+def _list_page(rng, catalog):
+    return Request("GET", f"{API}/", {"page": rng.randint(1, 20), "page_size": rng.choice([10, 20, 50])})
+
+
+def _list_filtered(rng, catalog):
+    params = rng.choice([
+        {"genre": rng.choice(catalog.genre_names)},
+        {"release_year": rng.randint(1950, 2024)},
+        {"title": rng.choice(["knight", "movie 1", "movie 99"])},
+        {"sort": rng.choice(["title", "average_rating"])},
+    ])
+    return Request("GET", f"{API}/", params)
+
+
+def _search(rng, catalog):
+    return Request("GET", f"{API}/", {"q": rng.choice(SEARCH_TERMS)})
+
+
+def _detail(rng, catalog):
+    return Request("GET", f"{API}/{catalog.movie_id(rng)}")
+
+
+def _batch(rng, catalog):
+    ids = [catalog.movie_id(rng) for _ in range(rng.choice([10, 20, 50]))]
+    return Request("GET", f"{API}/batch", {"ids": ",".join(map(str, ids))})
+
+
+def _rate(rng, catalog):
+    return Request("POST", f"{API}/{catalog.movie_id(rng)}/ratings", json={"score": rng.randint(1, 10)})
+
+
+def _create(rng, catalog):
+    return Request("POST", f"{API}/", json={
+        "title": f"Benchmark Movie {rng.randrange(10 ** 9)}",
+        "director_id": rng.choice(catalog.director_ids),
+        "release_year": rng.randint(1950, 2024),
+        "cast": "Bench Actor",
+        "genres": rng.sample(catalog.genre_ids, k=min(3, len(catalog.genre_ids))),
+    })
+
+
+def _update(rng, catalog):
+    return Request("PUT", f"{API}/{catalog.movie_id(rng)}", json={"release_year": rng.randint(1950, 2024)})
+
+
+GENERATORS: Dict[str, Generator] = {
+    "list": _list_page,
+    "list_filtered": _list_filtered,
+    "search": _search,
+    "detail": _detail,
+    "batch": _batch,
+    "rate": _rate,
+    "create": _create,
+    "update": _update,
+}
+
+# Relative weights per generator
+MIXES: Dict[str, Dict[str, int]] = {
+    "read": {"list": 30, "list_filtered": 15, "search": 10, "detail": 45},
+    "mixed": {"list": 25, "list_filtered": 12, "search": 8, "detail": 35, "rate": 15, "create": 3, "update": 2},
+    # A watchlist page: one batch call, against the per-movie detail calls it replaces
+    "watchlist": {"batch": 50, "detail": 50},
+    "write": {"detail": 20, "rate": 60, "create": 10, "update": 10},
+}
+
+
+def synthetic(mix: str, catalog: Catalog, seed: int = 0) -> Iterator[Request]:
+    """Endless, reproducible stream of requests drawn from a named mix."""
+    rng = random.Random(seed)
+    names, weights = list(MIXES[mix]), list(MIXES[mix].values())
+    while True:
+        name = rng.choices(names, weights=weights)[0]
+        yield GENERATORS[name](rng, catalog)
+
+
+def load_trace(path: Path) -> List[Request]:
+    """Read a recorded trace: one JSON object per line with method, path and optional params/json.
+
+        {"method": "GET", "path": "/api/v1/movies/", "params": {"genre": "Drama"}}
+        {"method": "POST", "path": "/api/v1/movies/12/ratings", "json": {"score": 8}}
+    """
+    requests = []
+    with path.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "method" not in entry or "path" not in entry:
+                raise ValueError(f"{path}:{line_number}: trace entries need 'method' and 'path'")
+            requests.append(Request(entry["method"].upper(), entry["path"], entry.get("params"), entry.get("json")))
+    return requests
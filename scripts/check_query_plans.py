@@ -0,0 +1,230 @@
+"""Query-plan regression checks for the repository layer.
+
+Creates a scratch database next to DATABASE_URL, loads the base tables (scripts/schema.sql,
+the DDL part of scripts/seeddb.sql), migrates it to head, seeds a synthetic catalog and then runs every repository query against it, capturing the SQL each one sends.
+Each captured statement is EXPLAINed and must not sequentially scan a large table (unless the
+case is a whole-catalog query by design) and must stay under its cost budget.
+
+    poetry run python scripts/check_query_plans.py
+    poetry run python scripts/check_query_plans.py --movies 200000 --keep
+
+Exits non-zero when any plan regresses. ALEMBIC_CONFIG selects an alternative alembic.ini.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from benchmarks.seed import CatalogSize, build_database, drop_database  # noqa: E402
+
+load_dotenv(ROOT / ".env")
+
+# Tables that grow with the catalog; a Seq Scan on any of them in a page-sized query is a regression
+LARGE_TABLES = {"movies", "movie_genres", "movie_ratings", "movie_rating_stats", "leaderboard_entries"}
+
+# Cost budget in planner units for point and page queries, whatever the catalog size.
+# Whole-catalog cases (average_rating ordering, export) instead carry a budget per seeded movie.
+PAGE_BUDGET = 2_000
+
+
+class StatementRecorder:
+    """Collects (statement, parameters) of single-row executions on an engine."""
+
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        # executemany batches are plain INSERT ... VALUES; there is no plan to check
+        if not executemany:
+            self.statements.append((statement, parameters))
+
+    def take(self):
+        statements, self.statements = self.statements, []
+        return statements
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(engine, statement: str, parameters) -> dict:
+    with engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def check_plan(plan: dict, allow_seq_scan: bool, budget: float) -> list:
+    problems = []
+    if not allow_seq_scan:
+        for node in walk(plan):
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+                problems.append(f"Seq Scan on {node['Relation Name']}")
+    if plan["Total Cost"] > budget:
+        problems.append(f"cost {plan['Total Cost']:.0f} over budget {budget:.0f}")
+    return problems
+
+
+def build_cases(has_trigram_index: bool):
+    """(name, callable(db), catalog_cost_per_movie) for every repository query path.
+
+    catalog_cost_per_movie is None for page-sized queries, which must use indexes and stay under
+    PAGE_BUDGET; whole-catalog queries may scan but must stay under that cost per seeded movie.
+    """
+    from app.repositories import dimension_repository, movie_repository, rating_repository, reference_repository
+    from app.repositories.director_repository import get_director_by_id
+    from app.repositories.genre_repository import get_genre_by_id
+    from app.schemas.movie import MovieCreate, MovieUpdate
+
+    middle = 4242
+    cases = [
+        ("get_movies default page with total", lambda db: movie_repository.get_movies(db), 0.5),
+        ("get_movies page without total", lambda db: movie_repository.get_movies(db, include_total=False), None),
+        ("get_movies deep offset page", lambda db: movie_repository.get_movies(db, page=200, include_total=False), None),
+        ("get_movies id keyset", lambda db: movie_repository.get_movies(db, after=(None, middle), include_total=False), None),
+        ("get_movies release_year", lambda db: movie_repository.get_movies(db, release_year=2001), None),
+        ("get_movies director", lambda db: movie_repository.get_movies(db, director_id=7, include_total=False), None),
+        ("get_movies genre", lambda db: movie_repository.get_movies(db, genre_ids=[7], include_total=False), None),
+        ("get_movies genre with total", lambda db: movie_repository.get_movies(db, genre_ids=[7]), 0.5),
+        ("get_movies any of genres", lambda db: movie_repository.get_movies(db, genre_ids=[3, 7], include_total=False), None),
+        (
+            "get_movies all of genres",
+            lambda db: movie_repository.get_movies(db, genre_ids=[3, 7], genre_match="all", include_total=False),
+            None,
+        ),
+        ("get_movies title sort", lambda db: movie_repository.get_movies(db, sort="title", include_total=False), None),
+        (
+            "get_movies title keyset",
+            lambda db: movie_repository.get_movies(db, sort="title", after=(f"Movie {middle}", middle), include_total=False),
+            None,
+        ),
+        ("get_movies average_rating sort", lambda db: movie_repository.get_movies(db, sort="average_rating"), 0.5),
+        ("get_movie_by_id", lambda db: movie_repository.get_movie_by_id(db, middle), None),
+        ("get_movies_by_ids", lambda db: movie_repository.get_movies_by_ids(db, list(range(middle, middle + 50))), None),
+        ("get_leaderboard top-rated", lambda db: movie_repository.get_leaderboard(db, "all", 0, False, 100), None),
+        ("get_leaderboard genre min_votes", lambda db: movie_repository.get_leaderboard(db, "genre", 7, False, 20, 5), None),
+        ("get_leaderboard year trending", lambda db: movie_repository.get_leaderboard(db, "year", 2001, True, 20), None),
+        ("get_movie_version", lambda db: movie_repository.get_movie_version(db, middle), None),
+        ("movie_exists", lambda db: movie_repository.movie_exists(db, middle), None),
+        ("iter_movies_for_export", lambda db: next(movie_repository.iter_movies_for_export(db, 100)), 20),
+        ("get_director_by_id", lambda db: get_director_by_id(db, 7), None),
+        ("get_genre_by_id", lambda db: get_genre_by_id(db, 7), None),
+        ("get_dimension_versions", lambda db: dimension_repository.get_dimension_versions(db), None),
+        ("load_directors", lambda db: dimension_repository.load_directors(db), None),
+        ("load_genres", lambda db: dimension_repository.load_genres(db), None),
+        ("find_existing_references", lambda db: reference_repository.find_existing_references(db, {1, 2, 999999}, {3, 4}), None),
+        (
+            "create_movie",
+            lambda db: movie_repository.create_movie(db, MovieCreate(title="Plan Check", director_id=1, genres=[1, 2])),
+            None,
+        ),
+        (
+            "update_movie genres",
+            lambda db: movie_repository.update_movie(db, middle, MovieUpdate(genres=[1, 5])),
+            None,
+        ),
+        ("get_rating_histograms", lambda db: rating_repository.get_rating_histograms(db, range(middle, middle + 50)), None),
+        ("create_rating", lambda db: rating_repository.create_rating(db, middle, 7), None),
+        ("create_ratings_bulk", lambda db: rating_repository.create_ratings_bulk(db, [(middle, 3), (middle + 1, 9)]), None),
+        ("upsert_rating new key", lambda db: rating_repository.upsert_rating(db, middle, 6, idempotency_key="plan-a"), None),
+        ("upsert_rating replay", lambda db: rating_repository.upsert_rating(db, middle, 6, idempotency_key="plan-a"), None),
+        ("upsert_rating user vote", lambda db: rating_repository.upsert_rating(db, middle, 4, user_id="plan-user"), None),
+        ("upsert_rating user revote", lambda db: rating_repository.upsert_rating(db, middle, 9, user_id="plan-user"), None),
+    ]
+    if has_trigram_index:
+        cases += [
+            ("get_movies title filter", lambda db: movie_repository.get_movies(db, title="knight"), None),
+            ("get_movies q search", lambda db: movie_repository.get_movies(db, q="knight"), None),
+        ]
+    return cases
+
+
+# Statements Postgres runs for ON DELETE CASCADE; EXPLAIN on the parent DELETE does not show them
+CASCADE_LOOKUPS = [
+    ("cascade movies -> movie_ratings", "DELETE FROM movie_ratings WHERE movie_id = 4242"),
+    ("cascade movies -> movie_genres", "DELETE FROM movie_genres WHERE movie_id = 4242"),
+    ("cascade genres -> movie_genres", "DELETE FROM movie_genres WHERE genre_id = 7"),
+    ("cascade directors -> movies", "DELETE FROM movies WHERE director_id = 7"),
+    ("cascade movies -> movie_rating_stats", "DELETE FROM movie_rating_stats WHERE movie_id = 4242"),
+    ("cascade movies -> leaderboard_entries", "DELETE FROM leaderboard_entries WHERE movie_id = 4242"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check repository query plans against a seeded catalog.")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--directors", type=int, default=5_000)
+    parser.add_argument("--ratings-per-movie", type=int, default=10, help="average ratings per movie")
+    parser.add_argument("--database", default="movie_db_plan_check", help="scratch database name")
+    parser.add_argument("--schema", type=Path, default=ROOT / "scripts" / "schema.sql", help="base tables DDL")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    base_url = os.getenv("DATABASE_URL")
+    if not base_url:
+        sys.exit("DATABASE_URL is not set")
+    size = CatalogSize(movies=args.movies, directors=args.directors, ratings=args.movies * args.ratings_per_movie)
+
+    print(f"Building scratch database {args.database} with {args.movies} movies")
+    try:
+        url = build_database(base_url, args.database, size, args.schema)
+        engine = create_engine(url)
+        with engine.connect() as conn:
+            has_trigram_index = conn.scalar(text("SELECT to_regclass('ix_movies_title_trgm') IS NOT NULL"))
+
+        recorder = StatementRecorder(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        failures = 0
+
+        checks = []
+        for name, run, cost_per_movie in build_cases(has_trigram_index):
+            db = Session()
+            try:
+                run(db)
+            finally:
+                db.close()
+            for statement, parameters in recorder.take():
+                checks.append((name, statement, parameters, cost_per_movie))
+        checks += [(name, statement, None, None) for name, statement in CASCADE_LOOKUPS]
+        if not has_trigram_index:
+            print("Skipping title/q checks: ix_movies_title_trgm is missing (pg_trgm not installed)")
+
+        for name, statement, parameters, cost_per_movie in checks:
+            if statement.lstrip().upper().startswith(("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "SELECT PG_")):
+                continue
+            plan = explain(engine, statement, parameters)
+            whole_catalog = cost_per_movie is not None
+            budget = max(PAGE_BUDGET, args.movies * cost_per_movie) if whole_catalog else PAGE_BUDGET
+            problems = check_plan(plan, allow_seq_scan=whole_catalog, budget=budget)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status}] {name}: cost {plan['Total Cost']:.0f}" + (f" - {'; '.join(problems)}" if problems else ""))
+            if problems:
+                failures += 1
+                print("    " + " ".join(statement.split())[:400])
+        engine.dispose()
+    finally:
+        if not args.keep:
+            drop_database(base_url, args.database)
+
+    if failures:
+        sys.exit(f"{failures} query plan(s) regressed")
+    print("All query plans passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Bulk-import movies from a CSV or JSONL file.
+
+CSV files need a header with title, director_id and optionally release_year, cast and
+genres (genre ids separated by "|"). JSONL files hold one MovieCreate object per line.
+
+    poetry run python scripts/import_movies.py movies.csv
+    poetry run python scripts/import_movies.py movies.jsonl --chunk-size 5000
+"""
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import IMPORT_CHUNK_SIZE  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.import_service import decode_ndjson, import_movies  # noqa: E402
+
+
+def read_csv(handle):
+    # Line 1 is the header, so data rows start at line 2
+    for line, row in enumerate(csv.DictReader(handle), start=2):
+        record = {key: (value.strip() if value else None) for key, value in row.items() if key}
+        genres = record.pop("genres", None)
+        record["genres"] = [gid.strip() for gid in genres.split("|") if gid.strip()] if genres else []
+        yield line, record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import movies from CSV or JSONL.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--max-errors", type=int, default=20, help="number of row errors to print")
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "jsonl")
+    with args.path.open(newline="" if file_format == "csv" else None, encoding="utf-8") as handle:
+        records = read_csv(handle) if file_format == "csv" else decode_ndjson(handle)
+        with SessionLocal() as db:
+            result = import_movies(db, records, chunk_size=args.chunk_size)
+
+    print("--- Import Summary ---")
+    print(f"Rows: {result.total_rows}")
+    print(f"Imported: {result.imported}")
+    print(f"Failed: {result.failed}")
+    for error in result.errors[:args.max_errors]:
+        print(f"  line {error.line}: {error.error}")
+    if result.failed > args.max_errors:
+        print(f"  ... and {result.failed - args.max_errors} more")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
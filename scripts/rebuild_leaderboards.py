@@ -0,0 +1,24 @@
+"""Recompute every leaderboard entry, e.g. after changing LEADERBOARD_PRIOR_VOTES or LEADERBOARD_PRIOR_MEAN.
+
+    poetry run python scripts/rebuild_leaderboards.py
+
+Entries are otherwise kept current as movies and ratings are written. The trending value lives on
+movie_rating_stats and is copied as is; it cannot be rebuilt, since ratings carry no timestamps.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.leaderboard_service import rebuild_leaderboards  # noqa: E402
+
+
+def main():
+    with SessionLocal() as db:
+        count = rebuild_leaderboards(db)
+    print(f"Rebuilt {count} leaderboard entries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+-- Base tables only (the CREATE TABLE part of scripts/seeddb.sql, without the TMDB import).
+-- Scratch databases for the plan checks and benchmarks are built from this plus the migrations.
+
+CREATE TABLE IF NOT EXISTS directors (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    birth_year INTEGER,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS genres (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL UNIQUE,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS movies (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    director_id INTEGER NOT NULL REFERENCES directors(id) ON DELETE CASCADE,
+    release_year INTEGER,
+    "cast" TEXT
+);
+
+CREATE TABLE IF NOT EXISTS movie_genres (
+    movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+    genre_id INTEGER NOT NULL REFERENCES genres(id) ON DELETE CASCADE,
+    PRIMARY KEY (movie_id, genre_id)
+);
+
+CREATE TABLE IF NOT EXISTS movie_ratings (
+    id SERIAL PRIMARY KEY,
+    movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+    score INTEGER CHECK (score >= 1 AND score <= 10)
+);
@@ -1,4 +1,6 @@
+import base64
 import json
+import uuid
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -75,6 +77,29 @@ assert data["error"]["code"] == 422
 # assert "Invalid release_year" in data["error"]["message"] or "value is not a valid integer" in str(data["error"]["message"])
 print("Invalid year test passed")
 
+# Test cursors whose sort value does not match the sort
+print("\n=== Testing GET /api/v1/movies/ with malformed cursors ===")
+for sort, key in [("title", [5, 1]), ("average_rating", ["NaN", 1]), ("average_rating", ["abc", 1]), ("id", ["x", 1]), ("id", [None, True])]:
+    payload = json.dumps({"s": sort, "k": key}).encode()
+    cursor = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    response = client.get("/api/v1/movies/", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 422, (sort, key, response.status_code)
+    assert response.json()["error"]["message"] == "Invalid cursor"
+print("Malformed cursor test passed")
+
+# Test conditional GET on the list
+print("\n=== Testing GET /api/v1/movies/ with If-None-Match ===")
+response = client.get("/api/v1/movies/")
+etag = response.headers.get("ETag")
+assert etag, "List should carry an ETag"
+response = client.get("/api/v1/movies/", headers={"If-None-Match": etag})
+assert response.status_code == 304
+assert response.headers.get("ETag") == etag
+assert response.content == b""
+response = client.get("/api/v1/movies/", params={"page_size": 5}, headers={"If-None-Match": etag})
+assert response.status_code == 200, "Another page should not match the ETag"
+print("List If-None-Match test passed")
+
 # Test 3: Create a new movie (assuming director_id=1 and genre_id=1 exist; genres can be empty)
 print("\n=== Testing POST /api/v1/movies/ (Create Movie) ===")
 new_movie = {
@@ -187,6 +212,39 @@ if created_id is not None:
     assert isinstance(detail_data["updated_at"], str)
     print("Get movie detail test passed")
 
+    print("\n=== Testing GET /api/v1/movies/{movie_id} with If-None-Match ===")
+    detail_etag = response.headers.get("ETag")
+    assert detail_etag, "Detail should carry an ETag"
+    response = client.get(f"/api/v1/movies/{created_id}", headers={"If-None-Match": detail_etag})
+    assert response.status_code == 304
+    assert response.headers.get("ETag") == detail_etag
+    assert response.content == b""
+    print("Detail If-None-Match test passed")
+
+    # Test batch fetches keep the requested order and mark unknown ids
+    print("\n=== Testing GET /api/v1/movies/batch ===")
+    other_id = paginated_data["items"][0]["id"] if paginated_data["items"] else created_id
+    requested = [created_id, 999999, other_id]
+    response = client.get("/api/v1/movies/batch", params={"ids": ",".join(map(str, requested))})
+    assert response.status_code == 200
+    items = response.json()["data"]["items"]
+    assert [item["id"] for item in items] == requested, "Batch should keep the requested order"
+    assert [item["found"] for item in items] == [True, False, True]
+    assert items[0]["movie"]["title"] == new_movie["title"]
+    assert items[1]["movie"] is None
+    assert items[2]["movie"]["id"] == other_id
+    response = client.get("/api/v1/movies/ratings/summary", params={"ids": ",".join(map(str, requested))})
+    assert response.status_code == 200
+    items = response.json()["data"]["items"]
+    assert [item["id"] for item in items] == requested
+    assert [item["found"] for item in items] == [True, False, True]
+    assert items[0]["summary"]["ratings_count"] == 0
+    assert items[1]["summary"] is None
+    response = client.get("/api/v1/movies/batch", params={"ids": "1,abc"})
+    assert response.status_code == 422
+    assert "comma-separated" in response.json()["error"]["message"]
+    print("Batch test passed")
+
     # Test 5: Add a rating to the movie
     print("\n=== Testing POST /api/v1/movies/{movie_id}/ratings (Add Rating) ===")
     rating = {"score": 8}
@@ -214,6 +272,24 @@ if created_id is not None:
     assert data["data"]["ratings_count"] == 2
     print("Verified multiple ratings average")
 
+    # Test rating summary statistics
+    print("\n=== Testing GET /api/v1/movies/{movie_id}/ratings/summary ===")
+    client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 4})
+    response = client.get(f"/api/v1/movies/{created_id}/ratings/summary")
+    assert response.status_code == 200
+    summary = response.json()["data"]
+    assert summary["ratings_count"] == 3
+    assert summary["histogram"] == [0, 0, 0, 1, 0, 1, 0, 1, 0, 0]
+    assert summary["average_rating"] == 6.0
+    assert summary["median"] == 6.0, "Median of 4, 6 and 8 is the middle score"
+    assert summary["stddev"] == 1.63, "Population standard deviation of 4, 6 and 8"
+    client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 10})
+    summary = client.get(f"/api/v1/movies/{created_id}/ratings/summary").json()["data"]
+    assert summary["ratings_count"] == 4
+    assert summary["median"] == 7.0, "Median of an even count is the mean of the two middle scores"
+    assert summary["stddev"] == 2.24
+    print("Rating summary test passed")
+
     # Test 9: Invalid rating (score out of range) on existing movie
     print("\n=== Testing POST /api/v1/movies/{movie_id}/ratings with invalid score ===")
     invalid_rating = {"score": 11}
@@ -235,6 +311,45 @@ if created_id is not None:
     assert "Movie not found" in data["error"]["message"]
     print("Rating on non-existing movie test passed")
 
+    # Test ratings deduplicated by Idempotency-Key and by user_id
+    print("\n=== Testing POST /api/v1/movies/{movie_id}/ratings with Idempotency-Key ===")
+    key = f"test-{uuid.uuid4()}"
+    response = client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 7}, headers={"Idempotency-Key": key})
+    assert response.status_code == 201
+    first_id = response.json()["data"]["id"]
+    response = client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 7}, headers={"Idempotency-Key": key})
+    assert response.status_code == 201
+    assert response.json()["data"]["id"] == first_id, "Replay should return the first rating"
+    response = client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 3}, headers={"Idempotency-Key": key})
+    assert response.status_code == 409
+    data = response.json()
+    assert data["status"] == "failure"
+    assert data["error"]["code"] == 409
+    data = client.get(f"/api/v1/movies/{created_id}").json()
+    assert data["data"]["ratings_count"] == 5, "Replays should not add ratings"
+    assert data["data"]["average_rating"] == 7.0
+    print("Idempotency-Key test passed")
+
+    print("\n=== Testing POST /api/v1/movies/{movie_id}/ratings changing a user's vote ===")
+    user_id = f"user-{uuid.uuid4()}"
+    vote_key = f"test-{uuid.uuid4()}"
+    response = client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 1, "user_id": user_id}, headers={"Idempotency-Key": vote_key})
+    assert response.status_code == 201
+    data = client.get(f"/api/v1/movies/{created_id}").json()
+    assert data["data"]["ratings_count"] == 6
+    assert data["data"]["average_rating"] == 6.0
+    response = client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 7, "user_id": user_id}, headers={"Idempotency-Key": f"test-{uuid.uuid4()}"})
+    assert response.status_code == 201
+    data = client.get(f"/api/v1/movies/{created_id}").json()
+    assert data["data"]["ratings_count"] == 6, "A changed vote should replace the earlier one"
+    assert data["data"]["average_rating"] == 7.0, "Stats should move by the difference between the votes"
+    # The vote keeps the key that created it, so replaying that request cannot restore the old score
+    response = client.post(f"/api/v1/movies/{created_id}/ratings", json={"score": 1, "user_id": user_id}, headers={"Idempotency-Key": vote_key})
+    assert response.status_code == 409
+    data = client.get(f"/api/v1/movies/{created_id}").json()
+    assert data["data"]["average_rating"] == 7.0
+    print("Changed vote test passed")
+
     # Test 6: Update the movie
     print("\n=== Testing PUT /api/v1/movies/{movie_id} (Update Movie) ===")
     update_data = {
@@ -252,6 +367,11 @@ if created_id is not None:
     assert updated_data["genres"] == []
     print("Update movie test passed")
 
+    response = client.get(f"/api/v1/movies/{created_id}", headers={"If-None-Match": detail_etag})
+    assert response.status_code == 200, "A changed movie should not match its old ETag"
+    assert response.headers.get("ETag") != detail_etag
+    print("Verified stale detail ETag")
+
     # Test update with invalid genre
     print("\n=== Testing PUT /api/v1/movies/{movie_id} with invalid genre ===")
     invalid_update = {"genres": [999999]}
@@ -298,6 +418,81 @@ if created_id is not None:
     assert "Movie not found" in data["error"]["message"]
     print("Delete non-existing test passed")
 
+# Test NDJSON import reporting bad rows without stopping
+print("\n=== Testing POST /api/v1/movies/import with invalid rows ===")
+rows = [
+    json.dumps({**new_movie, "title": "Imported Movie 1"}),
+    "{not json",
+    json.dumps({"director_id": 1}),
+    "",
+    json.dumps({**new_movie, "title": "Imported Bad Director", "director_id": 999999}),
+    json.dumps({**new_movie, "title": "Imported Movie 2"}),
+]
+response = client.post("/api/v1/movies/import", content="\n".join(rows), headers={"Content-Type": "application/x-ndjson"})
+assert response.status_code == 200
+result = response.json()["data"]
+assert result["total_rows"] == 5, "Blank lines should not count as rows"
+assert result["imported"] == 2
+assert result["failed"] == 3
+assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+assert "Invalid JSON" in result["errors"][0]["error"]
+assert "title" in result["errors"][1]["error"]
+assert len(result["movie_ids"]) == 2
+for movie_id, title in zip(result["movie_ids"], ["Imported Movie 1", "Imported Movie 2"]):
+    response = client.get(f"/api/v1/movies/{movie_id}")
+    assert response.status_code == 200
+    assert response.json()["data"]["title"] == title
+    client.delete(f"/api/v1/movies/{movie_id}")
+print("Import row errors test passed")
+
+# Test filtering by several genres
+print("\n=== Testing GET /api/v1/movies/ with genre_match ===")
+genres = client.get("/api/v1/genres/").json()["data"]["items"][:2]
+genre_year = 1902
+genre_movies = {
+    key: client.post("/api/v1/movies/", json={**new_movie, "title": f"Genre Match {key}", "release_year": genre_year, "genres": ids}).json()["data"]["id"]
+    for key, ids in [("first", [genres[0]["id"]]), ("both", [genre["id"] for genre in genres]), ("second", [genres[1]["id"]])]
+}
+params = {"release_year": genre_year, "genre": [genre["name"] for genre in genres]}
+response = client.get("/api/v1/movies/", params=params)
+assert response.status_code == 200
+assert sorted(item["id"] for item in response.json()["data"]["items"]) == sorted(genre_movies.values()), "Default should match any genre"
+response = client.get("/api/v1/movies/", params={**params, "genre_match": "all"})
+assert response.status_code == 200
+items = response.json()["data"]["items"]
+assert [item["id"] for item in items] == [genre_movies["both"]], "genre_match=all should need every genre"
+assert response.json()["data"]["total_items"] == 1
+response = client.get("/api/v1/movies/", params={**params, "genre_match": "some"})
+assert response.status_code == 422
+for movie_id in genre_movies.values():
+    client.delete(f"/api/v1/movies/{movie_id}")
+print("Genre match test passed")
+
+# Test leaderboard min_votes filter
+print("\n=== Testing GET /api/v1/leaderboards/top-rated with min_votes ===")
+board_year = 1901
+few_votes = client.post("/api/v1/movies/", json={**new_movie, "title": "Leaderboard Few Votes", "release_year": board_year}).json()["data"]["id"]
+many_votes = client.post("/api/v1/movies/", json={**new_movie, "title": "Leaderboard Many Votes", "release_year": board_year}).json()["data"]["id"]
+client.post(f"/api/v1/movies/{few_votes}/ratings", json={"score": 10})
+client.post(f"/api/v1/movies/{many_votes}/ratings", json={"score": 6})
+response = client.get("/api/v1/leaderboards/top-rated", params={"release_year": board_year, "min_votes": 2})
+assert response.status_code == 200
+assert response.json()["data"]["items"] == [], "No movie has two votes yet"
+client.post(f"/api/v1/movies/{many_votes}/ratings", json={"score": 7})
+client.post(f"/api/v1/movies/{many_votes}/ratings", json={"score": 8})
+response = client.get("/api/v1/leaderboards/top-rated", params={"release_year": board_year})
+assert sorted(item["movie"]["id"] for item in response.json()["data"]["items"]) == sorted([few_votes, many_votes])
+response = client.get("/api/v1/leaderboards/top-rated", params={"release_year": board_year, "min_votes": 2})
+items = response.json()["data"]["items"]
+assert [item["movie"]["id"] for item in items] == [many_votes], "Movies under min_votes should be left out"
+assert items[0]["rank"] == 1
+assert items[0]["ratings_count"] == 3
+response = client.get("/api/v1/leaderboards/top-rated", params={"min_votes": -1})
+assert response.status_code == 422
+client.delete(f"/api/v1/movies/{few_votes}")
+client.delete(f"/api/v1/movies/{many_votes}")
+print("Leaderboard min_votes test passed")
+
 # Test 8: Invalid creation (e.g., missing required fields)
 print("\n=== Testing POST /api/v1/movies/ with invalid data (missing title) ===")
 invalid_movie = {